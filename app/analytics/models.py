@@ -0,0 +1,68 @@
+class ProductSales:
+    __slots__ = ('item_type', 'item_id', 'name', 'quantity', 'revenue', 'tickets')
+    
+    def __init__(self, item_type, item_id, name, quantity, revenue, tickets):
+        self.item_type = item_type
+        self.item_id = item_id
+        self.name = name
+        self.quantity = quantity
+        self.revenue = revenue  # Integer centavos
+        self.tickets = tickets
+    
+    @classmethod
+    def from_db_row(cls, row):
+        return cls(row[0], row[1], row[2], row[3], row[4], row[5])
+
+class CategorySales:
+    __slots__ = ('item_type', 'category', 'quantity', 'revenue', 'share')
+    
+    def __init__(self, item_type, category, quantity, revenue, share):
+        self.item_type = item_type
+        self.category = category
+        self.quantity = quantity
+        self.revenue = revenue  # Integer centavos
+        self.share = share  # Fraction of total revenue in the period
+
+class SalesHeatmap:
+    """Revenue and ticket counts by local weekday (0 = Monday) and hour"""
+    
+    def __init__(self, revenue, tickets):
+        # 7 rows of 24 hours each
+        self.revenue = revenue
+        self.tickets = tickets
+    
+    def busiest(self):
+        """(weekday, hour) with the most tickets"""
+        return max(((day, hour) for day in range(7) for hour in range(24)),
+                   key=lambda cell: self.tickets[cell[0]][cell[1]])
+
+class CustomerStats:
+    __slots__ = ('customers', 'repeat_customers', 'named_tickets', 'anonymous_tickets', 'repeat_revenue')
+    
+    def __init__(self, customers, repeat_customers, named_tickets, anonymous_tickets, repeat_revenue):
+        self.customers = customers
+        self.repeat_customers = repeat_customers
+        self.named_tickets = named_tickets
+        self.anonymous_tickets = anonymous_tickets
+        self.repeat_revenue = repeat_revenue  # Integer centavos from repeat customers
+    
+    @property
+    def repeat_rate(self):
+        return self.repeat_customers / self.customers if self.customers else 0.0
+    
+    @classmethod
+    def from_db_row(cls, row):
+        return cls(row[0], row[1], row[2], row[3], row[4])
+
+class TrendPoint:
+    __slots__ = ('sale_date', 'revenue', 'ticket_count', 'moving_average')
+    
+    def __init__(self, sale_date, revenue, ticket_count, moving_average):
+        self.sale_date = sale_date
+        self.revenue = revenue  # Integer centavos
+        self.ticket_count = ticket_count
+        self.moving_average = moving_average  # Mean daily revenue over the window, centavos
+    
+    @classmethod
+    def from_db_row(cls, row):
+        return cls(row[0], row[1], row[2], row[3])
\ No newline at end of file
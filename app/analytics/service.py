@@ -0,0 +1,176 @@
+from .models import ProductSales, CategorySales, SalesHeatmap, CustomerStats, TrendPoint
+
+# Sales without a name count as walk-ins, names match case-insensitively.
+# Indexed by idx_sales_customer, change both together
+_CUSTOMER_KEY = "LOWER(TRIM(COALESCE(customer_name, '')))"
+
+class AnalyticsService:
+    """Sales reports computed as SQL aggregates over sales and sale_items.
+    
+    Every report is a single GROUP BY on a read-only connection, so nothing
+    is decoded from the sales.items JSON and Python only sees result rows.
+    Dates are inclusive ISO strings, None leaves that end open.
+    """
+    
+    def __init__(self, db):
+        self.db = db
+    
+    def _date_filter(self, column, start_date, end_date):
+        """SQL condition and params restricting column to the period"""
+        conditions = []
+        params = []
+        if start_date:
+            conditions.append(f"{column} >= ?")
+            params.append(start_date)
+        if end_date:
+            conditions.append(f"{column} <= ?")
+            params.append(end_date)
+        return " AND ".join(conditions) or "1 = 1", params
+    
+    def _product_totals(self, conn, start_date, end_date):
+        """Per product aggregate subquery and its params
+        
+        Scans idx_sale_items_product_totals in order, so grouping needs no
+        sort. A period becomes a sale_id range, since ids grow with time;
+        sales inside that range but dated outside the period (synced late
+        from a terminal journal) are excluded explicitly.
+        """
+        if start_date or end_date:
+            condition, params = self._date_filter("sale_date", start_date, end_date)
+            first_id, last_id = conn.execute(
+                f"SELECT MIN(id), MAX(id) FROM sales WHERE {condition}", params
+            ).fetchone()
+            where = f'''
+                WHERE sale_id BETWEEN ? AND ?
+                  AND sale_id NOT IN (SELECT id FROM sales WHERE NOT ({condition}) AND +id BETWEEN ? AND ?)
+            '''
+            params = [first_id, last_id, *params, first_id, last_id]
+        else:
+            where, params = "", []
+        query = f'''
+            SELECT item_type, item_id, SUM(quantity) AS quantity, SUM(line_total) AS revenue,
+                   COUNT(*) AS tickets
+            FROM sale_items
+            {where}
+            GROUP BY item_type, item_id
+        '''
+        return query, params
+    
+    def top_products(self, item_type=None, by='revenue', limit=10, start_date=None, end_date=None):
+        """Best sellers by 'revenue' or 'quantity', items and services unless item_type is given"""
+        if by not in ('revenue', 'quantity'):
+            raise ValueError(f"cannot rank by {by!r}")
+        with self.db.read_connection() as conn:
+            totals, params = self._product_totals(conn, start_date, end_date)
+            # Names are looked up for the top rows only
+            query = f'''
+                SELECT t.item_type, t.item_id,
+                       (SELECT name FROM sale_items WHERE item_type = t.item_type AND item_id = t.item_id LIMIT 1),
+                       t.quantity, t.revenue, t.tickets
+                FROM ({totals}) t
+                WHERE ? IS NULL OR t.item_type = ?
+                ORDER BY t.{by} DESC, t.item_id
+                LIMIT ?
+            '''
+            rows = conn.execute(query, params + [item_type, item_type, limit]).fetchall()
+        return [ProductSales.from_db_row(row) for row in rows]
+    
+    def category_breakdown(self, start_date=None, end_date=None):
+        """Revenue per (item type, category), largest first
+        
+        Categories come from the current catalog; deleted products are
+        reported as 'Uncategorized'.
+        """
+        with self.db.read_connection() as conn:
+            totals, params = self._product_totals(conn, start_date, end_date)
+            # Aggregate first, then look up the category once per product
+            query = f'''
+                SELECT t.item_type,
+                       COALESCE(CASE t.item_type WHEN 'item' THEN i.category ELSE sv.category END, 'Uncategorized'),
+                       SUM(t.quantity), SUM(t.revenue)
+                FROM ({totals}) t
+                LEFT JOIN inventory i ON t.item_type = 'item' AND i.id = t.item_id
+                LEFT JOIN services sv ON t.item_type = 'service' AND sv.id = t.item_id
+                GROUP BY 1, 2
+                ORDER BY 4 DESC
+            '''
+            rows = conn.execute(query, params).fetchall()
+        total = sum(row[3] for row in rows)
+        return [
+            CategorySales(item_type, category, quantity, revenue, revenue / total if total else 0.0)
+            for item_type, category, quantity, revenue in rows
+        ]
+    
+    def sales_heatmap(self, start_date=None, end_date=None):
+        """Tickets and revenue by local weekday and hour of the sale"""
+        condition, params = self._date_filter("sale_date", start_date, end_date)
+        # created_at is UTC. Totals per UTC hour come off idx_sales_date_time
+        # and only those groups go through 'localtime', which is exact for
+        # whole-hour offsets such as Manila's +08:00.
+        # %w counts from Sunday, shift it so Monday is 0
+        query = f'''
+            SELECT (CAST(strftime('%w', hour || ':00:00', 'localtime') AS INTEGER) + 6) % 7,
+                   CAST(strftime('%H', hour || ':00:00', 'localtime') AS INTEGER),
+                   SUM(tickets), SUM(revenue)
+            FROM (
+                SELECT substr(created_at, 1, 13) AS hour, COUNT(*) AS tickets, SUM(total_amount) AS revenue
+                FROM sales
+                WHERE {condition} AND created_at IS NOT NULL
+                GROUP BY hour
+            )
+            GROUP BY 1, 2
+        '''
+        revenue = [[0] * 24 for _ in range(7)]
+        tickets = [[0] * 24 for _ in range(7)]
+        with self.db.read_connection() as conn:
+            for weekday, hour, count, amount in conn.execute(query, params):
+                tickets[weekday][hour] = count
+                revenue[weekday][hour] = amount
+        return SalesHeatmap(revenue, tickets)
+    
+    def customer_stats(self, start_date=None, end_date=None):
+        """How many named customers came back more than once in the period"""
+        condition, params = self._date_filter("sale_date", start_date, end_date)
+        query = f'''
+            WITH per_customer AS (
+                SELECT {_CUSTOMER_KEY} AS customer, COUNT(*) AS tickets, SUM(total_amount) AS revenue
+                FROM sales
+                WHERE {condition}
+                GROUP BY 1
+            )
+            SELECT COUNT(*) FILTER (WHERE customer != ''),
+                   COUNT(*) FILTER (WHERE customer != '' AND tickets > 1),
+                   COALESCE(SUM(tickets) FILTER (WHERE customer != ''), 0),
+                   COALESCE(SUM(tickets) FILTER (WHERE customer = ''), 0),
+                   COALESCE(SUM(revenue) FILTER (WHERE customer != '' AND tickets > 1), 0)
+            FROM per_customer
+        '''
+        with self.db.read_connection() as conn:
+            row = conn.execute(query, params).fetchone()
+        return CustomerStats.from_db_row(row)
+    
+    def revenue_trend(self, start_date=None, end_date=None, window_days=7):
+        """Daily revenue with a trailing moving average, from daily_sales_summary
+        
+        The average is over calendar days: days without sales have no
+        summary row and count as zero revenue.
+        """
+        condition, params = self._date_filter("sale_date", start_date, end_date)
+        # Frame bounds must be literals, window_days is forced to an int
+        window = max(int(window_days), 1)
+        # RANGE over the day number spans calendar days, not rows; the first
+        # days of the period divide by the days seen so far
+        query = f'''
+            SELECT sale_date, revenue, ticket_count,
+                   CAST(ROUND(
+                       SUM(revenue) OVER (ORDER BY julianday(sale_date)
+                                          RANGE BETWEEN {window - 1} PRECEDING AND CURRENT ROW)
+                       * 1.0 / MIN({window}, julianday(sale_date) - MIN(julianday(sale_date)) OVER () + 1)
+                   ) AS INTEGER)
+            FROM daily_sales_summary
+            WHERE {condition}
+            ORDER BY sale_date
+        '''
+        with self.db.read_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [TrendPoint.from_db_row(row) for row in rows]
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""Every analytics report over a year of sales at 1,000 sales a day, with
+one to four lines each across inventory items and services.
+
+Run from the app directory: python -m benchmarks.analytics
+"""
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from analytics.service import AnalyticsService
+from core.db import DatabaseManager
+
+DAYS = 365
+SALES_PER_DAY = 1_000
+ITEMS = 2_000
+SERVICES = 50
+CUSTOMERS = 100_000
+
+
+def seed(db, rng):
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT INTO inventory (name, brand, category, price, stock) VALUES (?, ?, ?, ?, ?)",
+        ((f"Part {i}", "Brand", f"Category {i % 12}", 10_000, 1_000) for i in range(1, ITEMS + 1))
+    )
+    conn.executemany(
+        "INSERT INTO services (name, category, price) VALUES (?, ?, ?)",
+        ((f"Service {i}", f"Repair {i % 4}", 50_000) for i in range(1, SERVICES + 1))
+    )
+    first_day = date.today() - timedelta(days=DAYS - 1)
+    sale_id = 0
+    sales = []
+    lines = []
+    for day in range(DAYS):
+        sale_date = (first_day + timedelta(days=day)).isoformat()
+        for _ in range(SALES_PER_DAY):
+            sale_id += 1
+            total = 0
+            for _ in range(rng.randint(1, 4)):
+                if rng.random() < 0.15:
+                    item_type, item_id, price = 'service', rng.randint(1, SERVICES), 50_000
+                else:
+                    item_type, item_id, price = 'item', rng.randint(1, ITEMS), 10_000
+                quantity = rng.randint(1, 3)
+                total += price * quantity
+                lines.append((sale_id, item_type, item_id, f"{item_type} {item_id}", quantity, price,
+                              price * quantity))
+            # Half the tickets are walk-ins without a name
+            customer = f"Customer {rng.randint(1, CUSTOMERS)}" if rng.random() < 0.5 else ""
+            sold_at = f"{sale_date} {rng.randint(0, 23):02}:{rng.randint(0, 59):02}:00"
+            sales.append((sale_id, sale_date, total, "[]", customer, sold_at))
+    conn.executemany(
+        "INSERT INTO sales (id, sale_date, total_amount, items, customer_name, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        sales
+    )
+    conn.executemany(
+        "INSERT INTO sale_items (sale_id, item_type, item_id, name, quantity, unit_price, line_total) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        lines
+    )
+    conn.commit()
+    db.rebuild_daily_sales_summary()
+    conn.execute("ANALYZE")
+    return len(sales), len(lines)
+
+
+def timed(label, report):
+    start = time.perf_counter()
+    result = report()
+    print(f"  {label:32} {(time.perf_counter() - start) * 1000:7.1f} ms")
+    return result
+
+
+def main():
+    rng = random.Random(22)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "data", "bench.db"))
+        start = time.perf_counter()
+        sales, lines = seed(db, rng)
+        print(f"Seeded {sales:,} sales with {lines:,} lines in {time.perf_counter() - start:.1f} s")
+
+        analytics = AnalyticsService(db)
+        last_month = (date.today() - timedelta(days=29)).isoformat()
+        start = time.perf_counter()
+        top = timed("top products by revenue", lambda: analytics.top_products())
+        timed("top items by quantity", lambda: analytics.top_products('item', by='quantity'))
+        timed("top products, last 30 days", lambda: analytics.top_products(start_date=last_month))
+        categories = timed("category breakdown", lambda: analytics.category_breakdown())
+        heatmap = timed("weekday x hour heatmap", lambda: analytics.sales_heatmap())
+        customers = timed("customer repeat rate", lambda: analytics.customer_stats())
+        trend = timed("revenue trend, 7 day average", lambda: analytics.revenue_trend())
+        print(f"  {'all reports':32} {(time.perf_counter() - start) * 1000:7.1f} ms")
+
+        print(f"Best seller {top[0].name}, {len(categories)} categories, busiest slot {heatmap.busiest()}, "
+              f"repeat rate {customers.repeat_rate:.0%}, {len(trend)} trend days")
+        assert sum(sum(row) for row in heatmap.tickets) == sales
+        assert customers.named_tickets + customers.anonymous_tickets == sales
+        assert sum(category.revenue for category in categories) == sum(point.revenue for point in trend)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""Checkout latency for 50-line carts: per-line SELECT + UPDATE versus the
+batched conditional decrement in SalesService.record_sale.
+
+Both run the whole record_sale, so the daily summary (user-009), the
+reservation cleanup (user-017) and the replenishment update (user-025) are
+in both numbers; only the stock step differs. The last line is record_sale
+with that step skipped, the per-sale cost of everything else.
+
+Run from the app directory: python -m benchmarks.checkout
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from core.db import DatabaseManager
+from sales.models import CartItem
+from sales.service import SalesService
+
+ITEMS = 5_000
+LINES = 50
+CHECKOUTS = 500
+
+
+class LegacyStockSalesService(SalesService):
+    """record_sale with the stock step as it was before the batched decrement"""
+
+    def _update_inventory_stock(self, cursor, quantities, now):
+        for item_id, quantity in quantities.items():
+            cursor.execute("SELECT stock FROM inventory WHERE id = ?", (item_id,))
+            result = cursor.fetchone()
+            if result:
+                new_stock = max(result[0] - quantity, 0)
+                cursor.execute("UPDATE inventory SET stock = ? WHERE id = ?", (new_stock, item_id))
+        return True
+
+
+class NoStockSalesService(SalesService):
+    """record_sale without touching stock, what the rest of a sale costs"""
+
+    def _update_inventory_stock(self, cursor, quantities, now):
+        return True
+
+
+def make_carts(rng):
+    carts = []
+    for _ in range(CHECKOUTS):
+        ids = rng.sample(range(1, ITEMS + 1), LINES)
+        carts.append([CartItem(item_id, f"Part {item_id}", 'item', 10_000, 1) for item_id in ids])
+    return carts
+
+
+def run(label, record, carts):
+    timings = []
+    for cart in carts:
+        total = sum(item.total for item in cart)
+        start = time.perf_counter()
+        record(cart, total)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95)]
+    print(f"  {label:<22} median {statistics.median(timings):7.3f} ms   p95 {p95:7.3f} ms")
+
+
+def main():
+    rng = random.Random(7)
+    carts = make_carts(rng)
+    print(f"{CHECKOUTS} checkouts of {LINES}-line carts against {ITEMS:,} items")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "data", "bench.db"))
+        conn = db.get_connection()
+        conn.executemany(
+            "INSERT INTO inventory (name, brand, category, price, stock) VALUES (?, ?, ?, ?, ?)",
+            ((f"Part {i}", "Brand", "CPU", 10_000, 1_000_000) for i in range(1, ITEMS + 1))
+        )
+        conn.commit()
+
+        run("before (select+update)", LegacyStockSalesService(db).record_sale, carts)
+        run("after (batched)", SalesService(db).record_sale, carts)
+        run("without stock step", NoStockSalesService(db).record_sale, carts)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Sales per second with several writers: every thread committing its own
+sales versus the group-commit WriteQueue, under both PRAGMA profiles.
+
+Run from the app directory: python -m benchmarks.group_commit
+"""
+import os
+import random
+import tempfile
+import threading
+import time
+
+from core.db import DatabaseManager
+from sales.models import Cart
+from sales.service import SalesService
+
+ITEMS = 5_000
+TERMINALS = 16
+SALES_PER_TERMINAL = 150
+LINES = 5
+
+
+def make_db(tmp, profile):
+    db = DatabaseManager(os.path.join(tmp, profile, "data", "bench.db"), pool_size=TERMINALS + 2, profile=profile)
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT INTO inventory (name, brand, category, price, stock) VALUES (?, ?, ?, ?, ?)",
+        ((f"Part {i}", "Brand", "RAM", 10_000, 1_000_000) for i in range(1, ITEMS + 1))
+    )
+    conn.commit()
+    return db
+
+
+def make_cart(rng):
+    cart = Cart()
+    for item_id in rng.sample(range(1, ITEMS + 1), LINES):
+        cart.add(item_id, f"Part {item_id}", 'item', 10_000, 1)
+    return cart
+
+
+def run(label, db, sell):
+    def terminal(seed):
+        rng = random.Random(seed)
+        sales = SalesService(db, f"bench-{seed}")
+        for _ in range(SALES_PER_TERMINAL):
+            cart = make_cart(rng)
+            sell(sales, cart)
+
+    threads = [threading.Thread(target=terminal, args=(n,)) for n in range(TERMINALS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    total = TERMINALS * SALES_PER_TERMINAL
+    print(f"  {label:<34} {total / elapsed:8.0f} sales/s")
+
+
+def main():
+    print(f"{TERMINALS} threads x {SALES_PER_TERMINAL} sales of {LINES} lines each")
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in ('default', 'durable'):
+            db = make_db(tmp, profile)
+            print(f"profile {profile}:")
+            run("commit per sale (record_sale)", db,
+                lambda sales, cart: sales.record_sale(cart, cart.total))
+            run("group commit (submit_sale)", db,
+                lambda sales, cart: sales.submit_sale(cart, cart.total).result())
+            writer = db.write_queue()
+            print(f"  {writer.jobs} sales in {writer.batches} commits, "
+                  f"{writer.jobs / writer.batches:.1f} per commit")
+            sold = db.get_connection().execute("SELECT COUNT(*) FROM sales").fetchone()[0]
+            assert sold == 2 * TERMINALS * SALES_PER_TERMINAL
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
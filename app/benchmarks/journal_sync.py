@@ -0,0 +1,73 @@
+"""Terminal journal against a server database in two local files: checkout
+latency while another process holds the server's write lock, then replay
+(twice, to show it is idempotent) once the lock is gone.
+
+Run from the app directory: python -m benchmarks.journal_sync
+"""
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from core.db import DatabaseManager
+from sales.journal import SaleJournal, SyncWorker
+from sales.models import Cart
+from sales.service import SalesService
+
+ITEMS = 1_000
+SALES = 500
+LOCK_SECONDS = 2.0
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        server_path = os.path.join(tmp, "server", "app.db")
+        db = DatabaseManager(server_path)
+        conn = db.get_connection()
+        conn.executemany(
+            "INSERT INTO inventory (name, brand, category, price, stock) VALUES (?, ?, ?, ?, ?)",
+            ((f"Part {i}", "Brand", "SSD", 10_000, 1_000_000) for i in range(1, ITEMS + 1))
+        )
+        conn.commit()
+        journal = SaleJournal(os.path.join(tmp, "terminal", "journal.db"))
+        worker = SyncWorker(journal, SalesService(db, "bench"))
+
+        # Stand-in for a slow or busy server: another connection holds the write lock
+        blocker = sqlite3.connect(server_path)
+        blocker.execute("BEGIN IMMEDIATE")
+        timings = []
+        locked_until = time.perf_counter() + LOCK_SECONDS
+        for i in range(SALES):
+            cart = Cart()
+            cart.add(i % ITEMS + 1, f"Part {i % ITEMS + 1}", 'item', 10_000, 1)
+            start = time.perf_counter()
+            journal.append(cart, cart.total, "Walk-in")
+            timings.append((time.perf_counter() - start) * 1000)
+        time.sleep(max(0.0, locked_until - time.perf_counter()))
+        blocker.rollback()
+        blocker.close()
+
+        timings.sort()
+        print(f"{SALES} checkouts while the server was locked for {LOCK_SECONDS:.0f} s")
+        print(f"  journal append    median {statistics.median(timings):.3f} ms   "
+              f"p95 {timings[int(len(timings) * 0.95)]:.3f} ms")
+
+        start = time.perf_counter()
+        written = worker.sync_once()
+        print(f"  replay            {written} sales in {time.perf_counter() - start:.2f} s, "
+              f"{journal.pending_count()} pending")
+
+        # Lose every synced mark, as if the terminal crashed before recording them
+        journal._conn.execute("UPDATE sale_journal SET synced_at = NULL")
+        journal._conn.commit()
+        written = worker.sync_once()
+        sold = conn.execute("SELECT COUNT(*) FROM sales").fetchone()[0]
+        print(f"  second replay     {written} new sales, server has {sold} sales")
+        assert written == 0 and sold == SALES
+        journal.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""REAL pesos versus INTEGER centavos: exactness and speed of SUM over a
+million sale lines, and the cost of formatting amounts for display.
+
+Run from the app directory: python -m benchmarks.money
+"""
+import random
+import sqlite3
+import time
+import timeit
+from decimal import Decimal
+
+from core.utils import format_currency
+
+LINES = 1_000_000
+
+
+def timed_sum(conn, table):
+    start = time.perf_counter()
+    total = conn.execute(f"SELECT SUM(line_total) FROM {table}").fetchone()[0]
+    return total, (time.perf_counter() - start) * 1000
+
+
+def main():
+    rng = random.Random(11)
+    cents = [rng.randint(1, 5_000_000) for _ in range(LINES)]
+    exact = sum(cents)
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE pesos (line_total REAL)")
+    conn.execute("CREATE TABLE centavos (line_total INTEGER)")
+    conn.executemany("INSERT INTO pesos VALUES (?)", ((c / 100,) for c in cents))
+    conn.executemany("INSERT INTO centavos VALUES (?)", ((c,) for c in cents))
+
+    print(f"SUM over {LINES:,} sale lines, exact total {format_currency(exact)}")
+    total, ms = timed_sum(conn, "pesos")
+    error = Decimal(repr(total)) - Decimal(exact) / 100
+    print(f"  REAL pesos        {ms:7.1f} ms  {total!r}  off by {error}")
+    total, ms = timed_sum(conn, "centavos")
+    print(f"  INTEGER centavos  {ms:7.1f} ms  {total}  off by {total - exact}")
+
+    # Python side: running cart total of many float lines
+    float_total = 0.0
+    for c in cents[:10_000]:
+        float_total += c / 100
+    print(f"  float running total of 10,000 lines off by "
+          f"{Decimal(repr(float_total)) - Decimal(sum(cents[:10_000])) / 100}")
+
+    amount = 3_399_950
+    number = 1_000_000
+    seconds = timeit.timeit(lambda: format_currency(amount), number=number)
+    print(f"  format_currency   {seconds / number * 1e9:7.0f} ns per call")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
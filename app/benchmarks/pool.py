@@ -0,0 +1,75 @@
+"""Short-lived worker threads running a report query: a fresh connection
+per thread (the old thread-local behaviour) versus leasing from the pool.
+
+Run from the app directory: python -m benchmarks.pool
+"""
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from core.db import DatabaseManager
+
+ITEMS = 20_000
+TASKS = 400
+WORKERS = 4
+QUERY = "SELECT COUNT(*), SUM(price) FROM inventory WHERE stock < 5"
+
+
+def fresh_connection(db):
+    conn = sqlite3.connect(db.db_path, check_same_thread=False, timeout=30.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute(QUERY).fetchall()
+    conn.close()
+
+
+def pooled_connection(db):
+    with db.read_connection() as conn:
+        conn.execute(QUERY).fetchall()
+
+
+def run(label, task, db):
+    timings = []
+    lock = threading.Lock()
+
+    def worker(count):
+        for _ in range(count):
+            start = time.perf_counter()
+            task(db)
+            with lock:
+                timings.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(TASKS // WORKERS,)) for _ in range(WORKERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    timings.sort()
+    print(f"  {label:<18} median {statistics.median(timings):6.3f} ms   "
+          f"p95 {timings[int(len(timings) * 0.95)]:6.3f} ms   total {elapsed:5.2f} s")
+
+
+def main():
+    print(f"{TASKS} report queries from {WORKERS} threads over {ITEMS:,} items")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "data", "bench.db"))
+        conn = db.get_connection()
+        conn.executemany(
+            "INSERT INTO inventory (name, brand, category, price, stock) VALUES (?, ?, ?, ?, ?)",
+            ((f"Part {i}", "Brand", f"Cat {i % 20}", 10_000, i % 50) for i in range(ITEMS))
+        )
+        conn.commit()
+
+        run("fresh connection", fresh_connection, db)
+        run("pooled read-only", pooled_connection, db)
+        print(f"  open connections: {db.pool.stats()['open']} read-write, {db.read_pool.stats()['open']} read-only")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
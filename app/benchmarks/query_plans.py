@@ -0,0 +1,99 @@
+"""Seed a pre-migration database with 500k sales and compare query plans
+before and after the migration runner adds its indexes.
+
+Run from the app directory: python -m benchmarks.query_plans
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from core.db import DatabaseManager
+from core.migrations import HOT_QUERIES
+from core.utils import serialize_items
+
+SALES = 500_000
+ITEMS = 20_000
+SERVICES = 200
+
+
+def seed(path):
+    """Create the original unindexed schema and fill it"""
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE inventory (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, brand TEXT, category TEXT,
+            price REAL NOT NULL, stock INTEGER NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+        CREATE TABLE services (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, category TEXT,
+            price REAL NOT NULL, description TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+        CREATE TABLE sales (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, sale_date TEXT NOT NULL, total_amount REAL NOT NULL,
+            items TEXT NOT NULL, customer_name TEXT DEFAULT '', created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+    ''')
+    rng = random.Random(42)
+    categories = ["CPU", "GPU", "RAM", "Storage", "Motherboard", "PSU", "Case", "Cooling"]
+    conn.executemany(
+        "INSERT INTO inventory (name, brand, category, price, stock) VALUES (?, ?, ?, ?, ?)",
+        ((f"Part {i:05d}", f"Brand {i % 50}", rng.choice(categories), rng.randint(100, 50000), rng.randint(0, 100))
+         for i in range(ITEMS))
+    )
+    conn.executemany(
+        "INSERT INTO services (name, category, price, description) VALUES (?, ?, ?, ?)",
+        ((f"Service {i:03d}", rng.choice(["Repair", "Upgrade", "Cleaning"]), rng.randint(200, 5000), "")
+         for i in range(SERVICES))
+    )
+    start = date.today() - timedelta(days=730)
+
+    def sales():
+        for i in range(SALES):
+            item_id = rng.randint(1, ITEMS)
+            price = float(rng.randint(100, 50000))
+            items = serialize_items([{'id': item_id, 'name': f"Part {item_id - 1:05d}", 'type': 'item',
+                                      'price': price, 'quantity': 1, 'total': price}])
+            yield ((start + timedelta(days=i * 730 // SALES)).isoformat(), price, items, '')
+
+    conn.executemany("INSERT INTO sales (sale_date, total_amount, items, customer_name) VALUES (?, ?, ?, ?)", sales())
+    conn.commit()
+    conn.close()
+
+
+def report(conn):
+    for name, query, params in HOT_QUERIES:
+        try:
+            plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params)]
+        except sqlite3.OperationalError as e:
+            # Queries on tables the migrations create
+            print(f"  {name:<22} {'-':>9}     {e}")
+            continue
+        start = time.perf_counter()
+        conn.execute(query, params).fetchall()
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"  {name:<22} {elapsed:9.1f} ms  {' | '.join(plan)}")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data", "bench.db")
+        os.makedirs(os.path.dirname(path))
+        print(f"Seeding {SALES:,} sales, {ITEMS:,} items...")
+        seed(path)
+
+        conn = sqlite3.connect(path)
+        print("\nBefore migrations:")
+        report(conn)
+        conn.close()
+
+        start = time.perf_counter()
+        db = DatabaseManager(path)
+        print(f"\nMigrations applied in {time.perf_counter() - start:.1f} s")
+        print("\nAfter migrations:")
+        report(db.get_connection())
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Multi-process stress test for stock reservations: several terminals
+fight over a few scarce items on one WAL database. Every terminal reserves
+while building a cart, then checks out or clears it. Even terminals record
+sales directly, odd ones check out like the app: journal the sale, move the
+cart's holds onto it and replay the journal every few carts. Afterwards no
+item may be oversold or short on replay, and stock + units sold must equal
+the starting stock.
+
+Run from the app directory: python -m benchmarks.reservations
+"""
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from core.db import DatabaseManager
+from sales.journal import SaleJournal, SyncWorker
+from sales.models import Cart
+from sales.reservations import ReservationService
+from sales.service import SalesService, SaleError, InsufficientStockError
+
+TERMINALS = 8
+ROUNDS = 200
+ITEMS = 5
+STOCK = 300
+SYNC_EVERY = 10
+
+
+def terminal(db_path, terminal_no, start_event, results):
+    rng = random.Random(terminal_no)
+    terminal_id = f"bench-{terminal_no}"
+    db = DatabaseManager(db_path)
+    sales = SalesService(db, terminal_id)
+    reservations = ReservationService(db, terminal_id)
+    journal = worker = None
+    if terminal_no % 2:
+        journal = SaleJournal(os.path.join(os.path.dirname(db_path), f"journal-{terminal_id}.db"))
+        worker = SyncWorker(journal, sales)
+    sold = refused = failed_checkouts = 0
+    start_event.wait()
+
+    for round_no in range(ROUNDS):
+        cart = Cart()
+        for _ in range(rng.randint(1, 3)):
+            item_id = rng.randint(1, ITEMS)
+            quantity = rng.randint(1, 2)
+            try:
+                reservations.reserve(item_id, quantity)
+            except InsufficientStockError:
+                refused += 1
+                continue
+            cart.add(item_id, f"Part {item_id}", 'item', 10_000, quantity)
+
+        # One cart in five is abandoned at the counter
+        if not cart or rng.random() < 0.2:
+            reservations.release(cart.item_quantities())
+            continue
+        if journal is not None:
+            sale_uuid = journal.append(cart, cart.total)
+            sales.hold_for_sale(sale_uuid, list(cart))
+            sold += sum(line.quantity for line in cart)
+            # Leave sales pending for a while, other carts must still see them
+            if round_no % SYNC_EVERY == 0:
+                worker.sync_once()
+            continue
+        try:
+            sales.record_sale(cart, cart.total)
+            sold += sum(line.quantity for line in cart)
+        except SaleError:
+            failed_checkouts += 1
+            reservations.release(cart.item_quantities())
+
+    if journal is not None:
+        worker.sync_once()
+        failed_checkouts += journal.pending_count() + journal.failed_count()
+        journal.close()
+    db.close()
+    results.put((terminal_no, sold, refused, failed_checkouts))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "data", "bench.db")
+        db = DatabaseManager(db_path)
+        conn = db.get_connection()
+        conn.executemany(
+            "INSERT INTO inventory (name, brand, category, price, stock) VALUES (?, ?, ?, ?, ?)",
+            ((f"Part {i}", "Brand", "GPU", 10_000, STOCK) for i in range(1, ITEMS + 1))
+        )
+        conn.commit()
+
+        results = multiprocessing.Queue()
+        start_event = multiprocessing.Event()
+        processes = [
+            multiprocessing.Process(target=terminal, args=(db_path, n, start_event, results))
+            for n in range(TERMINALS)
+        ]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        start_event.set()
+        rows = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        print(f"{TERMINALS} terminals x {ROUNDS} carts over {ITEMS} items with {STOCK} each, {elapsed:.2f} s")
+        for terminal_no, sold, refused, failed in sorted(rows):
+            print(f"  terminal {terminal_no}: sold {sold:4}  refused reservations {refused:4}  "
+                  f"failed checkouts {failed}")
+
+        stock = sum(row[0] for row in conn.execute("SELECT stock FROM inventory"))
+        sold = conn.execute("SELECT COALESCE(SUM(quantity), 0) FROM sale_items").fetchone()[0]
+        negative = conn.execute("SELECT COUNT(*) FROM inventory WHERE stock < 0").fetchone()[0]
+        left = conn.execute("SELECT COUNT(*) FROM stock_reservations").fetchone()[0]
+        left += conn.execute("SELECT COUNT(*) FROM sale_holds").fetchone()[0]
+        shortages = conn.execute("SELECT COUNT(*) FROM stock_shortages").fetchone()[0]
+        print(f"  units sold {sold}, stock left {stock}, oversold items {negative}, "
+              f"replay shortages {shortages}, holds left {left}")
+        assert negative == 0 and shortages == 0, "an item was oversold"
+        assert stock + sold == ITEMS * STOCK, "stock and sales do not add up"
+        assert sum(row[1] for row in rows) == sold
+        assert sum(row[3] for row in rows) == 0, "a checkout failed despite its reservations"
+        print("  OK")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
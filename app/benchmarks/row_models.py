@@ -0,0 +1,86 @@
+"""Memory and construction time for 1M inventory rows held as the original
+dict-backed objects, slotted InventoryItem objects and a
+ColumnarRows container, filled from tuples and from a sqlite3 cursor.
+
+Run from the app directory: python -m benchmarks.row_models
+"""
+import gc
+import sqlite3
+import time
+import tracemalloc
+
+from core.rows import ColumnarRows
+from inventory.models import InventoryItem
+
+ROWS = 1_000_000
+
+
+class DictInventoryItem:
+    """InventoryItem as it was before __slots__"""
+
+    def __init__(self, id, name, brand, category, price, stock):
+        self.id = id
+        self.name = name
+        self.brand = brand
+        self.category = category
+        self.price = price
+        self.stock = stock
+
+    @classmethod
+    def from_db_row(cls, row):
+        return cls(row[0], row[1], row[2], row[3], row[4], row[5])
+
+
+def build_objects(model, rows):
+    return [model.from_db_row(row) for row in rows]
+
+
+def build_columnar(rows):
+    columnar = ColumnarRows(InventoryItem, ["id", "name", "brand", "category", "price", "stock"],
+                            {'id': 'q', 'price': 'q', 'stock': 'q'})
+    for start in range(0, len(rows), 10_000):
+        columnar.extend(rows[start:start + 10_000])
+    return columnar
+
+
+def build_columnar_from_cursor(conn):
+    cursor = conn.execute("SELECT id, name, brand, category, price, stock FROM inventory ORDER BY name")
+    return ColumnarRows.from_cursor(cursor, InventoryItem, {'id': 'q', 'price': 'q', 'stock': 'q'})
+
+
+def measure(label, build, rows):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(rows)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<26} {elapsed:7.2f} s  {size / 1024 / 1024:8.1f} MiB")
+    del result
+
+
+def main():
+    # Shared strings, as sqlite3 would hand out for repeated values
+    brands = [f"Brand {i}" for i in range(50)]
+    categories = ["CPU", "GPU", "RAM", "SSD", "PSU"]
+    rows = [(i, f"Part {i:07d}", brands[i % 50], categories[i % 5], 10_000 + i, i % 40) for i in range(ROWS)]
+
+    print(f"{ROWS:,} rows (source tuples excluded from the totals)")
+    measure("dict-backed objects", lambda r: build_objects(DictInventoryItem, r), rows)
+    measure("__slots__ InventoryItem", lambda r: build_objects(InventoryItem, r), rows)
+    measure("ColumnarRows", build_columnar, rows)
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE inventory (id INTEGER PRIMARY KEY, name TEXT, brand TEXT, category TEXT, "
+                 "price INTEGER, stock INTEGER)")
+    conn.executemany("INSERT INTO inventory VALUES (?, ?, ?, ?, ?, ?)", rows)
+    conn.execute("CREATE INDEX idx_inventory_name ON inventory(name)")
+    del rows
+    # Through a cursor every row gets its own brand and category strings
+    measure("ColumnarRows.from_cursor", build_columnar_from_cursor, conn)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Catalog search at 100k products: the old name LIKE '%term%' scan versus
+the FTS5 index behind InventoryService.search_items.
+
+Run from the app directory: python -m benchmarks.search
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from core.db import DatabaseManager
+from inventory.service import InventoryService
+from inventory.models import InventoryItem
+
+PRODUCTS = 100_000
+TERMS = ["48213", "aorus 4090 777", "vengeance ddr5 12", "ryz", "kingston", "zzz-no-hit"]
+REPEAT = 20
+
+BRANDS = ["AMD", "Intel", "NVIDIA", "Kingston", "Corsair", "Samsung", "ASUS", "MSI", "Gigabyte", "Seagate"]
+CATEGORIES = ["CPU", "GPU", "RAM", "SSD", "PSU", "Motherboard", "Case", "Cooling"]
+WORDS = ["Ryzen", "Core", "RTX", "Fury", "Vengeance", "EVO", "ROG", "Tomahawk", "Aorus", "Barracuda",
+         "i5", "i7", "i9", "4060", "4070", "4090", "DDR5", "NVMe", "650W", "850W"]
+
+
+def legacy_search(db, search_term):
+    cursor = db.get_connection().cursor()
+    cursor.execute("SELECT * FROM inventory WHERE name LIKE ? ORDER BY name", (f'%{search_term}%',))
+    return [InventoryItem.from_db_row(row) for row in cursor.fetchall()]
+
+
+def timed(search, term):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        results = search(term)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(results)
+
+
+def main():
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "data", "bench.db"))
+        conn = db.get_connection()
+        conn.executemany(
+            "INSERT INTO inventory (name, brand, category, price, stock) VALUES (?, ?, ?, ?, ?)",
+            ((f"{rng.choice(BRANDS)} {rng.choice(WORDS)} {rng.choice(WORDS)} {i}",
+              rng.choice(BRANDS), rng.choice(CATEGORIES), rng.randint(100, 90000), rng.randint(0, 50))
+             for i in range(PRODUCTS))
+        )
+        conn.commit()
+
+        service = InventoryService(db)
+        print(f"{PRODUCTS:,} products, median of {REPEAT} runs")
+        print(f"{'term':<18} {'LIKE':>10} {'hits':>7} {'FTS5':>10} {'hits':>7}")
+        for term in TERMS:
+            like_ms, like_hits = timed(lambda t: legacy_search(db, t), term)
+            fts_ms, fts_hits = timed(service.search_items, term)
+            print(f"{term:<18} {like_ms:>7.1f} ms {like_hits:>7} {fts_ms:>7.1f} ms {fts_hits:>7}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
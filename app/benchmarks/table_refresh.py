@@ -0,0 +1,65 @@
+"""Table refresh time: QTableWidget with one QTableWidgetItem per cell versus
+RowTableModel shown through a QTableView, at 1k, 10k and 100k rows.
+
+Run from the app directory: python -m benchmarks.table_refresh
+(set QT_QPA_PLATFORM=offscreen on a headless machine)
+"""
+import sys
+import time
+
+from PyQt6.QtWidgets import QApplication, QTableWidget, QTableWidgetItem
+
+from core.table_model import RowTableModel, create_table_view
+from core.utils import format_currency
+
+HEADERS = ["ID", "Name", "Brand", "Category", "Price", "Stock"]
+SIZES = [1_000, 10_000, 100_000]
+
+
+def make_rows(count):
+    return [(i, f"Part {i:06d}", f"Brand {i % 50}", "CPU", 10_000 + i, i % 40) for i in range(count)]
+
+
+def refresh_widget(table, rows):
+    table.setRowCount(len(rows))
+    for row, item in enumerate(rows):
+        table.setItem(row, 0, QTableWidgetItem(str(item[0])))
+        table.setItem(row, 1, QTableWidgetItem(item[1]))
+        table.setItem(row, 2, QTableWidgetItem(item[2]))
+        table.setItem(row, 3, QTableWidgetItem(item[3]))
+        table.setItem(row, 4, QTableWidgetItem(format_currency(item[4])))
+        table.setItem(row, 5, QTableWidgetItem(str(item[5])))
+
+
+def timed(app, refresh):
+    start = time.perf_counter()
+    refresh()
+    # Include the paint of the visible rows
+    app.processEvents()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    app = QApplication(sys.argv)
+
+    widget = QTableWidget()
+    widget.setColumnCount(len(HEADERS))
+    widget.setHorizontalHeaderLabels(HEADERS)
+    widget.resize(1000, 600)
+    widget.show()
+
+    model = RowTableModel(HEADERS, {4: format_currency})
+    view = create_table_view(model)
+    view.resize(1000, 600)
+    view.show()
+
+    print(f"{'rows':>8}  {'QTableWidget':>14}  {'RowTableModel':>14}")
+    for size in SIZES:
+        rows = make_rows(size)
+        widget_ms = timed(app, lambda: refresh_widget(widget, rows))
+        model_ms = timed(app, lambda: model.set_rows(list(rows)))
+        print(f"{size:>8}  {widget_ms:>11.1f} ms  {model_ms:>11.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import threading
+
+class CatalogCache:
+    """Read-through in-memory cache for one catalog table.
+    
+    Rows are indexed by id, by category and by any unique attributes named
+    in keys (e.g. sku). ChangeEvents for the table drop the affected ids,
+    which are re-read in one query on next access.
+    """
+    
+    def __init__(self, entity, load_all, load_ids, keys=()):
+        self.entity = entity
+        self._load_all = load_all
+        self._load_ids = load_ids
+        self._lock = threading.Lock()
+        self._by_id = {}
+        self._by_category = {}
+        # attribute -> {value: id}, None values are not indexed
+        self._by_key = {key: {} for key in keys}
+        self._sorted = None
+        self._complete = False
+        self._stale = set()
+        # Bumped by every invalidation so a slow load cannot store old rows
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, row_id):
+        """Get one row by id, or None if it does not exist"""
+        rows = self.get_many([row_id])
+        return rows[0] if rows else None
+    
+    def get_many(self, row_ids):
+        """Get the rows for the given ids, skipping ids that do not exist"""
+        with self._lock:
+            missing = [
+                i for i in row_ids
+                if i in self._stale or (i not in self._by_id and not self._complete)
+            ]
+            if missing:
+                self.misses += 1
+            else:
+                self.hits += 1
+            version = self._version
+        
+        if missing:
+            self._store(self._load_ids(missing), missing, version)
+        
+        with self._lock:
+            return [self._by_id[i] for i in row_ids if i in self._by_id]
+    
+    def get_all(self):
+        """Get every row, ordered by name"""
+        self._ensure_complete()
+        with self._lock:
+            if self._sorted is None:
+                self._sorted = sorted(self._by_id.values(), key=lambda row: row.name)
+            return list(self._sorted)
+    
+    def get_by_category(self, category):
+        """Get every row in one category, ordered by name"""
+        self._ensure_complete()
+        with self._lock:
+            rows = [self._by_id[i] for i in self._by_category.get(category, ())]
+        return sorted(rows, key=lambda row: row.name)
+    
+    def get_by_key(self, key, value):
+        """Get the row whose unique attribute key equals value, or None"""
+        self._ensure_complete()
+        with self._lock:
+            row_id = self._by_key[key].get(value)
+            return self._by_id.get(row_id) if row_id is not None else None
+    
+    def _ensure_complete(self):
+        with self._lock:
+            if self._complete and not self._stale:
+                self.hits += 1
+                return
+            self.misses += 1
+            complete = self._complete
+            stale = list(self._stale)
+            version = self._version
+        
+        if complete:
+            self._store(self._load_ids(stale), stale, version)
+            return
+        
+        rows = self._load_all()
+        with self._lock:
+            if version != self._version:
+                return
+            self._clear()
+            self._add(rows)
+            self._sorted = rows
+            self._complete = True
+    
+    def _store(self, rows, requested, version):
+        with self._lock:
+            if version != self._version:
+                return
+            for row_id in requested:
+                self._drop(row_id)
+                self._stale.discard(row_id)
+            self._add(rows)
+            self._sorted = None
+    
+    def _add(self, rows):
+        for row in rows:
+            self._by_id[row.id] = row
+            self._by_category.setdefault(row.category, set()).add(row.id)
+            for key, index in self._by_key.items():
+                value = getattr(row, key)
+                if value is not None:
+                    index[value] = row.id
+    
+    def _drop(self, row_id):
+        row = self._by_id.pop(row_id, None)
+        if row is not None:
+            self._by_category.get(row.category, set()).discard(row_id)
+            for key, index in self._by_key.items():
+                value = getattr(row, key)
+                if index.get(value) == row_id:
+                    del index[value]
+    
+    def _clear(self):
+        self._by_id = {}
+        self._by_category = {}
+        self._by_key = {key: {} for key in self._by_key}
+    
+    def invalidate(self, row_ids=None):
+        """Forget the given ids, or everything when row_ids is None"""
+        with self._lock:
+            self._version += 1
+            self._sorted = None
+            if row_ids is None:
+                self._clear()
+                self._complete = False
+                self._stale.clear()
+                return
+            for row_id in row_ids:
+                self._drop(row_id)
+                if self._complete:
+                    self._stale.add(row_id)
+    
+    def on_change(self, event):
+        if event.entity == self.entity:
+            self.invalidate(event.ids)
+    
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'rows': len(self._by_id)}
+
+
+def shared_cache(db, entity, load_all, load_ids, keys=()):
+    """The CatalogCache for entity on this database, created on first use"""
+    cache = db.catalog_caches.get(entity)
+    if cache is None:
+        cache = db.catalog_caches[entity] = CatalogCache(entity, load_all, load_ids, keys)
+        # Invalidate before any view reacts to the same event
+        db.events.subscribe(cache.on_change, first=True)
+    return cache
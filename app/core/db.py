@@ -1,33 +1,163 @@
 import sqlite3
 import os
 import threading
+import weakref
+from contextlib import contextmanager
 from datetime import datetime
+from core.utils import deserialize_items
+from core.migrations import run_migrations
+from core.events import EventBus
+from core.pool import ConnectionPool, PRAGMA_PROFILES
+from core.writer import WriteQueue
+from core.versions import ExternalChangeMonitor
 
 class DatabaseManager:
-    def __init__(self, db_path="data/app.db"):  # Updated path
+    def __init__(self, db_path="data/app.db", pool_size=8, profile='default'):  # Updated path
         # Create data directory if it doesn't exist
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         self.db_path = db_path
         self._local = threading.local()
+        # Each thread leases one connection for as long as it lives
+        self.pool = ConnectionPool(db_path, pool_size, PRAGMA_PROFILES[profile])
+        # Read-only connections for reports, opened on first use
+        self.read_pool = ConnectionPool(db_path, pool_size, PRAGMA_PROFILES['reporting'], read_only=True)
+        # Group-commit writer, started by the first write_queue() call
+        self._write_queue = None
+        self._write_queue_lock = threading.Lock()
+        # Services publish ChangeEvents here after each committed write
+        self.events = EventBus()
+        # entity -> core.cache.CatalogCache, shared by every service instance
+        self.catalog_caches = {}
+        # Dedicated connection for change polling, data_version is per connection
+        self._version_conn = None
+        self._version_lock = threading.Lock()
+        self._change_monitor = None
         self.create_tables()
     
     def get_connection(self):
-        """Get database connection with thread-local storage"""
-        if not hasattr(self._local, 'conn') or self._local.conn is None:
-            self._local.conn = sqlite3.connect(
-                self.db_path, 
-                check_same_thread=False,
-                timeout=30.0
-            )
-            self._local.conn.execute("PRAGMA journal_mode=WAL")
-            self._local.conn.execute("PRAGMA busy_timeout=5000")
-        return self._local.conn
+        """Get this thread's pooled connection, leased on first use"""
+        lease = getattr(self._local, 'lease', None)
+        if lease is None:
+            lease = _Lease(self.pool.acquire())
+            # Goes back to the pool when the thread exits and drops its locals
+            lease.release = weakref.finalize(lease, self.pool.release, lease.conn)
+            self._local.lease = lease
+        return lease.conn
+    
+    def release_connection(self):
+        """Return this thread's connection to the pool before the thread ends"""
+        lease = getattr(self._local, 'lease', None)
+        if lease is not None:
+            self._local.lease = None
+            lease.release()
+    
+    @contextmanager
+    def transaction(self, immediate=False):
+        """Cursor in a transaction on this thread's connection
+        
+        Commits when the block ends and rolls back if it raises. immediate
+        takes the write lock up front, for read-then-write transactions.
+        Inside an open transaction the block becomes a savepoint instead.
+        Once change polling runs, writes should go through here: the
+        table_versions counters are read before and after the block so the
+        monitor does not report this process's own commits back to it.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        if conn.in_transaction:
+            cursor.execute("SAVEPOINT nested")
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute("ROLLBACK TO nested")
+                cursor.execute("RELEASE nested")
+                raise
+            cursor.execute("RELEASE nested")
+            return
+        
+        monitor = self._change_monitor
+        # A deferred transaction that read the counters could not upgrade to
+        # a write once another process committed, so take the lock up front
+        cursor.execute("BEGIN IMMEDIATE" if immediate or monitor is not None else "BEGIN")
+        try:
+            before = _read_table_versions(cursor) if monitor is not None else None
+            yield cursor
+            after = _read_table_versions(cursor) if monitor is not None else None
+            conn.commit()
+        except BaseException:
+            # Also when the commit failed, or later blocks would nest in the dead transaction
+            conn.rollback()
+            raise
+        if monitor is not None:
+            monitor.local_commit(before, after)
+    
+    @contextmanager
+    def read_connection(self):
+        """Read-only connection for reporting queries
+        
+        WAL readers never block the writer, so long reports and exports can
+        run next to checkouts.
+        """
+        with self.read_pool.connection() as conn:
+            yield conn
+    
+    def write_queue(self):
+        """The shared WriteQueue, started on first use"""
+        with self._write_queue_lock:
+            if self._write_queue is None:
+                self._write_queue = WriteQueue(self)
+            return self._write_queue
+    
+    def _polling_connection(self):
+        if self._version_conn is None:
+            self._version_conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True,
+                                                 check_same_thread=False)
+        return self._version_conn
+    
+    def data_version(self):
+        """Changes whenever any other connection, in any process, commits"""
+        with self._version_lock:
+            return self._polling_connection().execute("PRAGMA data_version").fetchone()[0]
+    
+    def table_versions(self):
+        """table -> modification counter, bumped by triggers on every row change"""
+        with self._version_lock:
+            return _read_table_versions(self._polling_connection())
+    
+    def poll_external_changes(self):
+        """Publish bulk ChangeEvents for tables other processes changed
+        
+        The first call only records the current counters. Returns the names
+        of the changed tables.
+        """
+        if self._change_monitor is None:
+            self._change_monitor = ExternalChangeMonitor(self)
+            return []
+        return self._change_monitor.poll()
+    
+    def close(self):
+        """Close every pooled connection, call once on shutdown after workers stop"""
+        with self._write_queue_lock:
+            if self._write_queue is not None:
+                self._write_queue.close()
+                self._write_queue = None
+        self._change_monitor = None
+        with self._version_lock:
+            if self._version_conn is not None:
+                self._version_conn.close()
+                self._version_conn = None
+        self._local = threading.local()
+        self.pool.close()
+        self.read_pool.close()
     
     def create_tables(self):
         """Create all necessary tables with customer_name column"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
+        # Persistent setting stored in the database file, only needed once
+        cursor.execute("PRAGMA journal_mode=WAL")
+        
         # Inventory table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS inventory (
@@ -65,4 +195,107 @@ class DatabaseManager:
             )
         ''')
         
-        conn.commit()
\ No newline at end of file
+        # Sale line items - one row per cart line
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sale_items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sale_id INTEGER NOT NULL REFERENCES sales(id) ON DELETE CASCADE,
+                item_type TEXT NOT NULL,
+                item_id INTEGER NOT NULL,
+                name TEXT,
+                quantity INTEGER NOT NULL,
+                unit_price REAL NOT NULL,
+                line_total REAL NOT NULL
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sale_items_sale ON sale_items(sale_id)")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sale_items_product_totals "
+            "ON sale_items(item_type, item_id, sale_id, quantity, line_total)"
+        )
+        
+        conn.commit()
+        
+        # Bring older databases up to the current schema version
+        run_migrations(self)
+    
+    def explain_query_plan(self, query, params=()):
+        """Get the EXPLAIN QUERY PLAN detail lines for a query"""
+        cursor = self.get_connection().cursor()
+        cursor.execute("EXPLAIN QUERY PLAN " + query, params)
+        return [row[3] for row in cursor.fetchall()]
+    
+    def backfill_sale_items(self, batch_size=1000):
+        """Copy JSON sale items into sale_items for sales that have no lines yet"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        # Inside a migration the caller's transaction covers every batch
+        own_transaction = not conn.in_transaction
+        last_id = 0
+        migrated = 0
+        
+        while True:
+            cursor.execute('''
+                SELECT id, items FROM sales
+                WHERE id > ? AND NOT EXISTS (SELECT 1 FROM sale_items WHERE sale_id = sales.id)
+                ORDER BY id LIMIT ?
+            ''', (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            
+            lines = []
+            for sale_id, items_json in rows:
+                for item in deserialize_items(items_json):
+                    quantity = item.get('quantity', 1)
+                    price = item.get('price', 0)
+                    lines.append((
+                        sale_id, item.get('type', 'item'), item.get('id'), item.get('name'),
+                        quantity, price, item.get('total', price * quantity)
+                    ))
+            
+            # One transaction per batch keeps the WAL small on big histories
+            cursor.executemany(
+                "INSERT INTO sale_items (sale_id, item_type, item_id, name, quantity, unit_price, line_total) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                lines
+            )
+            if own_transaction:
+                conn.commit()
+            last_id = rows[-1][0]
+            migrated += len(rows)
+        
+        return migrated
+    
+    def rebuild_daily_sales_summary(self):
+        """Recompute daily_sales_summary from sales and sale_items"""
+        with self.transaction() as cursor:
+            cursor.execute("DELETE FROM daily_sales_summary")
+            cursor.execute('''
+                INSERT INTO daily_sales_summary (sale_date, revenue, ticket_count, items_sold, service_revenue)
+                SELECT s.sale_date, SUM(s.total_amount), COUNT(*),
+                       COALESCE(SUM(l.items_sold), 0), COALESCE(SUM(l.service_revenue), 0)
+                FROM sales s
+                LEFT JOIN (
+                    SELECT sale_id,
+                           SUM(CASE WHEN item_type = 'item' THEN quantity ELSE 0 END) AS items_sold,
+                           SUM(CASE WHEN item_type = 'service' THEN line_total ELSE 0 END) AS service_revenue
+                    FROM sale_items GROUP BY sale_id
+                ) l ON l.sale_id = s.id
+                GROUP BY s.sale_date
+            ''')
+            days = cursor.rowcount
+        return days
+
+
+def _read_table_versions(conn):
+    return dict(conn.execute("SELECT table_name, version FROM table_versions"))
+
+
+class _Lease:
+    """Holder for a thread's connection, its finalizer returns the connection"""
+    __slots__ = ('conn', 'release', '__weakref__')
+    
+    def __init__(self, conn):
+        self.conn = conn
+        self.release = None
\ No newline at end of file
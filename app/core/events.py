@@ -0,0 +1,56 @@
+import threading
+
+INSERT = 'insert'
+UPDATE = 'update'
+DELETE = 'delete'
+
+class ChangeEvent:
+    """Describes rows that changed in one table.
+    
+    ids=None means any row may have changed (bulk edits), fields=None means
+    any column may have changed.
+    """
+    
+    def __init__(self, entity, action, ids=None, fields=None):
+        self.entity = entity
+        self.action = action
+        self.ids = tuple(ids) if ids is not None else None
+        self.fields = frozenset(fields) if fields is not None else None
+    
+    def touches(self, *fields):
+        """True if any of the given columns may have changed"""
+        return self.fields is None or not self.fields.isdisjoint(fields)
+    
+    def __repr__(self):
+        return f"ChangeEvent({self.entity!r}, {self.action!r}, ids={self.ids}, fields={self.fields})"
+
+class EventBus:
+    """Synchronous publish/subscribe for ChangeEvents.
+    
+    Callbacks run on the publishing thread; Qt widgets should subscribe
+    through core.qt_events.ChangeRelay instead.
+    """
+    
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+    
+    def subscribe(self, callback, first=False):
+        """Add a callback, first=True runs it before existing subscribers"""
+        with self._lock:
+            if first:
+                self._subscribers.insert(0, callback)
+            else:
+                self._subscribers.append(callback)
+        return callback
+    
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+    
+    def publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            callback(event)
@@ -0,0 +1,439 @@
+"""Versioned schema migrations tracked with PRAGMA user_version"""
+
+
+def _add_sales_customer_name(db, cursor):
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(sales)")]
+    if 'customer_name' not in columns:
+        cursor.execute("ALTER TABLE sales ADD COLUMN customer_name TEXT DEFAULT ''")
+
+
+def _backfill_sale_items(db, cursor):
+    db.backfill_sale_items()
+
+
+def _add_query_indexes(db, cursor):
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sales_date ON sales(sale_date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_inventory_name ON inventory(name)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_inventory_stock ON inventory(stock)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_inventory_category ON inventory(category)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_services_name ON services(name)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_services_category ON services(category)")
+    cursor.execute("ANALYZE")
+
+
+# FTS sync triggers, shared by the search index and table rebuild migrations
+CATALOG_SEARCH_TRIGGERS = [
+    '''CREATE TRIGGER IF NOT EXISTS inventory_fts_insert AFTER INSERT ON inventory BEGIN
+        INSERT INTO inventory_fts(rowid, name, brand, category)
+        VALUES (new.id, new.name, new.brand, new.category);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS inventory_fts_delete AFTER DELETE ON inventory BEGIN
+        INSERT INTO inventory_fts(inventory_fts, rowid, name, brand, category)
+        VALUES ('delete', old.id, old.name, old.brand, old.category);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS inventory_fts_update AFTER UPDATE OF name, brand, category ON inventory BEGIN
+        INSERT INTO inventory_fts(inventory_fts, rowid, name, brand, category)
+        VALUES ('delete', old.id, old.name, old.brand, old.category);
+        INSERT INTO inventory_fts(rowid, name, brand, category)
+        VALUES (new.id, new.name, new.brand, new.category);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS services_fts_insert AFTER INSERT ON services BEGIN
+        INSERT INTO services_fts(rowid, name, category, description)
+        VALUES (new.id, new.name, new.category, new.description);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS services_fts_delete AFTER DELETE ON services BEGIN
+        INSERT INTO services_fts(services_fts, rowid, name, category, description)
+        VALUES ('delete', old.id, old.name, old.category, old.description);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS services_fts_update AFTER UPDATE OF name, category, description ON services BEGIN
+        INSERT INTO services_fts(services_fts, rowid, name, category, description)
+        VALUES ('delete', old.id, old.name, old.category, old.description);
+        INSERT INTO services_fts(rowid, name, category, description)
+        VALUES (new.id, new.name, new.category, new.description);
+    END''',
+]
+
+
+def _create_catalog_search_triggers(cursor):
+    # One statement at a time, executescript would commit the open transaction
+    for trigger in CATALOG_SEARCH_TRIGGERS:
+        cursor.execute(trigger)
+
+
+def _add_catalog_search_index(db, cursor):
+    # External-content FTS5 tables, the rows themselves stay in inventory/services
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS inventory_fts USING fts5(
+            name, brand, category,
+            content='inventory', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    ''')
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS services_fts USING fts5(
+            name, category, description,
+            content='services', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    ''')
+    
+    # Triggers keep the index in sync, stock changes do not touch it
+    _create_catalog_search_triggers(cursor)
+    
+    # Index the rows that already exist
+    cursor.execute("INSERT INTO inventory_fts(inventory_fts) VALUES ('rebuild')")
+    cursor.execute("INSERT INTO services_fts(services_fts) VALUES ('rebuild')")
+
+
+def _add_daily_sales_summary(db, cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_sales_summary (
+            sale_date TEXT PRIMARY KEY,
+            revenue REAL NOT NULL DEFAULT 0,
+            ticket_count INTEGER NOT NULL DEFAULT 0,
+            items_sold INTEGER NOT NULL DEFAULT 0,
+            service_revenue REAL NOT NULL DEFAULT 0
+        )
+    ''')
+    db.rebuild_daily_sales_summary()
+
+
+def _add_inventory_sku(db, cursor):
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(inventory)")]
+    if 'sku' not in columns:
+        cursor.execute("ALTER TABLE inventory ADD COLUMN sku TEXT")
+    # Items without a code stay NULL, so uniqueness only applies to real codes
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_inventory_sku ON inventory(sku) WHERE sku IS NOT NULL")
+
+
+def _add_stock_reservations(db, cursor):
+    # One row per terminal and item, expires_at is a Unix timestamp
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stock_reservations (
+            terminal_id TEXT NOT NULL,
+            item_id INTEGER NOT NULL REFERENCES inventory(id) ON DELETE CASCADE,
+            quantity INTEGER NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (terminal_id, item_id)
+        )
+    ''')
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_stock_reservations_item ON stock_reservations(item_id, expires_at)"
+    )
+
+
+def _add_sales_uuid(db, cursor):
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(sales)")]
+    if 'sale_uuid' not in columns:
+        cursor.execute("ALTER TABLE sales ADD COLUMN sale_uuid TEXT")
+    # Sales from before journaling have no UUID
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_sales_uuid ON sales(sale_uuid) WHERE sale_uuid IS NOT NULL")
+
+
+def _cents(column):
+    return f"CAST(ROUND({column} * 100) AS INTEGER)"
+
+
+# sales.items with price and total in centavos, rewritten in SQL so a long
+# history never round-trips through Python
+_SALE_ITEMS_JSON_TO_CENTS = f'''
+    CASE WHEN json_valid(items) THEN (
+        SELECT json_group_array(json(json_set(value,
+            '$.price', {_cents("COALESCE(json_extract(value, '$.price'), 0)")},
+            '$.total', {_cents("COALESCE(json_extract(value, '$.total'), COALESCE(json_extract(value, '$.price'), 0) * COALESCE(json_extract(value, '$.quantity'), 1))")}
+        )))
+        FROM json_each(items)
+    ) ELSE items END
+'''
+
+
+def _rebuild_table(cursor, table, create_sql, select_sql):
+    """Replace a table with a new definition, create_sql names it {table}"""
+    cursor.execute(create_sql.format(table=f"{table}_new"))
+    cursor.execute(f"INSERT INTO {table}_new {select_sql}")
+    cursor.execute(f"DROP TABLE {table}")
+    cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+
+
+def _convert_money_to_centavos(db, cursor):
+    # REAL affinity would turn stored integers back into floats, so every
+    # money column gets a rebuilt table with INTEGER affinity
+    _rebuild_table(cursor, 'inventory', '''
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            brand TEXT,
+            category TEXT,
+            price INTEGER NOT NULL,
+            stock INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sku TEXT
+        )
+    ''', f"SELECT id, name, brand, category, {_cents('price')}, stock, created_at, sku FROM inventory")
+    
+    _rebuild_table(cursor, 'services', '''
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            category TEXT,
+            price INTEGER NOT NULL,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''', f"SELECT id, name, category, {_cents('price')}, description, created_at FROM services")
+    
+    _rebuild_table(cursor, 'sales', '''
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sale_date TEXT NOT NULL,
+            total_amount INTEGER NOT NULL,
+            items TEXT NOT NULL,
+            customer_name TEXT DEFAULT '',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sale_uuid TEXT
+        )
+    ''', f"SELECT id, sale_date, {_cents('total_amount')}, {_SALE_ITEMS_JSON_TO_CENTS}, "
+         f"customer_name, created_at, sale_uuid FROM sales")
+    
+    _rebuild_table(cursor, 'sale_items', '''
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sale_id INTEGER NOT NULL REFERENCES sales(id) ON DELETE CASCADE,
+            item_type TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            name TEXT,
+            quantity INTEGER NOT NULL,
+            unit_price INTEGER NOT NULL,
+            line_total INTEGER NOT NULL
+        )
+    ''', f"SELECT id, sale_id, item_type, item_id, name, quantity, "
+         f"{_cents('unit_price')}, {_cents('line_total')} FROM sale_items")
+    
+    _rebuild_table(cursor, 'daily_sales_summary', '''
+        CREATE TABLE {table} (
+            sale_date TEXT PRIMARY KEY,
+            revenue INTEGER NOT NULL DEFAULT 0,
+            ticket_count INTEGER NOT NULL DEFAULT 0,
+            items_sold INTEGER NOT NULL DEFAULT 0,
+            service_revenue INTEGER NOT NULL DEFAULT 0
+        )
+    ''', f"SELECT sale_date, {_cents('revenue')}, ticket_count, items_sold, "
+         f"{_cents('service_revenue')} FROM daily_sales_summary")
+    
+    # Indexes and FTS triggers were dropped with the old tables
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sale_items_sale ON sale_items(sale_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sale_items_product ON sale_items(item_type, item_id)")
+    _add_inventory_sku(db, cursor)
+    _add_sales_uuid(db, cursor)
+    _add_query_indexes(db, cursor)
+    _create_catalog_search_triggers(cursor)
+
+
+def _add_analytics_indexes(db, cursor):
+    # Covering indexes so the analytics reports never read table rows:
+    # product totals in index order, with sale_id to filter by period
+    cursor.execute("DROP INDEX IF EXISTS idx_sale_items_product")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sale_items_product_totals "
+        "ON sale_items(item_type, item_id, sale_id, quantity, line_total)"
+    )
+    # Replaces idx_sales_date for every sale_date lookup. id right after
+    # sale_date keeps ORDER BY sale_date DESC, id DESC (history pages) an
+    # index walk, the trailing columns cover the heatmap by sale time
+    cursor.execute("DROP INDEX IF EXISTS idx_sales_date")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sales_date_time ON sales(sale_date, id, created_at, total_amount)"
+    )
+    # Same expression as analytics.service._CUSTOMER_KEY, or it is not used
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sales_customer "
+        "ON sales(LOWER(TRIM(COALESCE(customer_name, ''))), sale_date, total_amount)"
+    )
+    cursor.execute("ANALYZE")
+
+# Tables with a modification counter in table_versions
+VERSIONED_TABLES = ('inventory', 'services', 'sales')
+
+
+def _create_table_version_triggers(cursor):
+    # SQLite triggers are per row, so a bulk edit bumps the counter once per row
+    for table in VERSIONED_TABLES:
+        for action in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_version_{action.lower()} AFTER {action} ON {table} BEGIN
+                    UPDATE table_versions SET version = version + 1 WHERE table_name = '{table}';
+                END
+            ''')
+
+
+def _add_table_versions(db, cursor):
+    # Bumped by every committed write, from this process or any other
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    cursor.executemany(
+        "INSERT OR IGNORE INTO table_versions (table_name) VALUES (?)", [(table,) for table in VERSIONED_TABLES]
+    )
+    _create_table_version_triggers(cursor)
+
+# Keep item_replenishment.below_reorder equal to stock <= reorder_point, new
+# items start at inventory.replenishment.LOW_STOCK_MIN
+REPLENISHMENT_TRIGGERS = [
+    '''CREATE TRIGGER IF NOT EXISTS inventory_replenishment_insert AFTER INSERT ON inventory BEGIN
+        INSERT OR IGNORE INTO item_replenishment (item_id, below_reorder) VALUES (new.id, new.stock <= 4);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS inventory_replenishment_stock AFTER UPDATE OF stock ON inventory BEGIN
+        UPDATE item_replenishment SET below_reorder = (new.stock <= reorder_point)
+        WHERE item_id = new.id AND below_reorder != (new.stock <= reorder_point);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS inventory_replenishment_delete AFTER DELETE ON inventory BEGIN
+        DELETE FROM item_replenishment WHERE item_id = old.id;
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS item_replenishment_reorder_point
+    AFTER UPDATE OF reorder_point ON item_replenishment WHEN new.reorder_point != old.reorder_point BEGIN
+        UPDATE item_replenishment
+        SET below_reorder = ((SELECT stock FROM inventory WHERE id = new.item_id) <= new.reorder_point)
+        WHERE item_id = new.item_id;
+    END''',
+]
+
+
+def _add_item_replenishment(db, cursor):
+    # One row per inventory item, see inventory.replenishment
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS item_replenishment (
+            item_id INTEGER PRIMARY KEY,
+            velocity REAL NOT NULL DEFAULT 0,
+            current_day TEXT,
+            current_units INTEGER NOT NULL DEFAULT 0,
+            daily_demand REAL NOT NULL DEFAULT 0,
+            reorder_point INTEGER NOT NULL DEFAULT 4,
+            below_reorder INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_item_replenishment_below ON item_replenishment(below_reorder) "
+        "WHERE below_reorder = 1"
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_item_replenishment_day ON item_replenishment(current_day)")
+    for trigger in REPLENISHMENT_TRIGGERS:
+        cursor.execute(trigger)
+    
+    # Replay the sales history once, later sales update it incrementally
+    from inventory.replenishment import ReplenishmentService
+    ReplenishmentService(db).rebuild(cursor)
+
+
+def _add_sale_holds(db, cursor):
+    # Stock of checkouts still in a terminal's journal, one row per sale and
+    # item until the replay writes the sale. No expiry, the goods are gone
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sale_holds (
+            sale_uuid TEXT NOT NULL,
+            item_id INTEGER NOT NULL REFERENCES inventory(id) ON DELETE CASCADE,
+            quantity INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (sale_uuid, item_id)
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sale_holds_item ON sale_holds(item_id)")
+    # Replayed sales that sold more than the stock on record
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stock_shortages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sale_id INTEGER NOT NULL REFERENCES sales(id) ON DELETE CASCADE,
+            item_id INTEGER NOT NULL,
+            requested INTEGER NOT NULL,
+            available INTEGER NOT NULL,
+            recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+# (version, description, function) - append only, never renumber
+MIGRATIONS = [
+    (1, "add sales.customer_name", _add_sales_customer_name),
+    (2, "backfill sale_items from sales.items", _backfill_sale_items),
+    (3, "add indexes for lookups, filters and ORDER BY name", _add_query_indexes),
+    (4, "add FTS5 search index for inventory and services", _add_catalog_search_index),
+    (5, "add daily_sales_summary rollup", _add_daily_sales_summary),
+    (6, "add inventory.sku with unique index", _add_inventory_sku),
+    (7, "add stock_reservations for multi-terminal carts", _add_stock_reservations),
+    (8, "add sales.sale_uuid for idempotent journal replay", _add_sales_uuid),
+    (9, "store money as integer centavos", _convert_money_to_centavos),
+    (10, "add covering indexes for sales analytics", _add_analytics_indexes),
+    (11, "add table_versions change counters", _add_table_versions),
+    (12, "add item_replenishment reorder points", _add_item_replenishment),
+    (13, "add sale_holds and stock_shortages for journaled sales", _add_sale_holds),
+]
+
+# Queries the tabs run on every refresh, used by explain_hot_queries()
+HOT_QUERIES = [
+    ("today's sales", "SELECT * FROM sales WHERE sale_date = ?", ('2025-01-01',)),
+    ("today's total", "SELECT revenue FROM daily_sales_summary WHERE sale_date = ?", ('2025-01-01',)),
+    ("sales history", "SELECT * FROM sales ORDER BY sale_date DESC, id DESC", ()),
+    ("low stock",
+     "SELECT * FROM item_replenishment r JOIN inventory i ON i.id = r.item_id WHERE r.below_reorder = 1", ()),
+    ("inventory list", "SELECT * FROM inventory ORDER BY name", ()),
+    ("inventory categories",
+     "SELECT DISTINCT category FROM inventory WHERE category IS NOT NULL ORDER BY category", ()),
+    ("services list", "SELECT * FROM services ORDER BY name", ()),
+    ("services categories",
+     "SELECT DISTINCT category FROM services WHERE category IS NOT NULL ORDER BY category", ()),
+]
+
+
+# How long a terminal waits for another one's migration to finish
+MIGRATION_LOCK_TIMEOUT_MS = 10 * 60 * 1000
+
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(db, migrations=MIGRATIONS):
+    """Apply pending migrations in order, returns the versions applied
+    
+    Each migration and its user_version check share one BEGIN IMMEDIATE
+    transaction, so terminals starting together on a shared database apply
+    it once: the others wait for the lock and then find it done.
+    """
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    applied = []
+    # Unlocked first look, an up-to-date database never takes the lock
+    if get_schema_version(conn) >= max((version for version, _, _ in migrations), default=0):
+        return applied
+    
+    # Another terminal's migration can hold the lock far past busy_timeout
+    busy_timeout = conn.execute("PRAGMA busy_timeout").fetchone()[0]
+    conn.execute(f"PRAGMA busy_timeout = {MIGRATION_LOCK_TIMEOUT_MS}")
+    try:
+        for version, description, migrate in migrations:
+            if version <= get_schema_version(conn):
+                continue
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                # Checked again under the lock, another terminal may have applied it
+                if version <= get_schema_version(conn):
+                    conn.rollback()
+                    continue
+                migrate(db, cursor)
+                # PRAGMA does not accept bound parameters
+                cursor.execute(f"PRAGMA user_version = {int(version)}")
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise RuntimeError(f"Migration {version} ({description}) failed: {e}") from e
+            applied.append(version)
+    finally:
+        conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout)}")
+    
+    return applied
+
+
+def explain_hot_queries(db):
+    """Return (name, plan lines) for every query in HOT_QUERIES"""
+    return [(name, db.explain_query_plan(query, params)) for name, query, params in HOT_QUERIES]
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""Bounded SQLite connection pool with per-connection PRAGMA profiles"""
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# Per-connection settings, journal_mode=WAL is persistent and set once per file
+PRAGMA_PROFILES = {
+    # GUI and services: WAL makes synchronous=NORMAL safe against corruption
+    'default': {
+        'busy_timeout': 5000,
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,      # KiB, negative means size rather than pages
+        'temp_store': 'MEMORY',
+        'mmap_size': 64 * 1024 * 1024,
+    },
+    # Every commit survives power loss, slower writes
+    'durable': {
+        'busy_timeout': 5000,
+        'synchronous': 'FULL',
+        'cache_size': -16000,
+        'temp_store': 'MEMORY',
+    },
+    # Read-only connections for reports and exports
+    'reporting': {
+        'busy_timeout': 5000,
+        'query_only': 1,
+        'cache_size': -64000,
+        'temp_store': 'MEMORY',
+        'mmap_size': 256 * 1024 * 1024,
+    },
+}
+
+
+class PoolTimeout(RuntimeError):
+    """Raised when no connection frees up within the pool timeout"""
+
+
+class ConnectionPool:
+    """At most `size` open connections to one database file.
+    
+    Connections are opened lazily, handed out by acquire() and kept open
+    when released so the next caller skips connect and PRAGMA setup.
+    """
+    
+    def __init__(self, db_path, size=8, pragmas=None, read_only=False, timeout=30.0):
+        self.db_path = db_path
+        self.size = size
+        self.pragmas = pragmas or PRAGMA_PROFILES['default']
+        self.read_only = read_only
+        self.timeout = timeout
+        self._idle = []
+        self._opened = 0
+        self._closed = False
+        self._available = threading.Condition()
+    
+    def _connect(self):
+        if self.read_only:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True,
+                                   check_same_thread=False, timeout=self.timeout)
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=self.timeout)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+    
+    def acquire(self):
+        """Take a connection, waiting up to timeout for one to be released"""
+        deadline = time.monotonic() + self.timeout
+        with self._available:
+            while True:
+                if self._closed:
+                    raise PoolTimeout("connection pool is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if self._opened < self.size:
+                    self._opened += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"no free connection after {self.timeout}s ({self.size} in use)")
+                self._available.wait(remaining)
+        
+        # Connect outside the lock, it touches the file system
+        try:
+            return self._connect()
+        except Exception:
+            with self._available:
+                self._opened -= 1
+                self._available.notify()
+            raise
+    
+    def release(self, conn):
+        """Give a connection back, an open transaction is rolled back"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Broken connection, do not hand it out again
+            self._discard(conn)
+            return
+        with self._available:
+            if not self._closed:
+                self._idle.append(conn)
+                self._available.notify()
+                return
+        self._discard(conn)
+    
+    def _discard(self, conn):
+        conn.close()
+        with self._available:
+            self._opened -= 1
+            self._available.notify()
+    
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+    
+    def close(self):
+        """Close idle connections now and leased ones as they come back"""
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+            self._available.notify_all()
+        for conn in idle:
+            conn.close()
+    
+    def stats(self):
+        with self._available:
+            return {'open': self._opened, 'idle': len(self._idle), 'size': self.size}
\ No newline at end of file
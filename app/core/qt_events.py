@@ -0,0 +1,15 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+
+class ChangeRelay(QObject):
+    """Re-emits EventBus events as a Qt signal.
+    
+    Events published from worker threads are queued to the thread that owns
+    the relay, so connected slots can safely touch widgets.
+    """
+    changed = pyqtSignal(object)
+    
+    def __init__(self, bus, parent=None):
+        super().__init__(parent)
+        emit = self.changed.emit
+        bus.subscribe(emit)
+        self.destroyed.connect(lambda: bus.unsubscribe(emit))
@@ -0,0 +1,53 @@
+from array import array
+
+class ColumnarRows:
+    """Compact result set stored column by column.
+    
+    Numeric columns listed in typecodes live in typed arrays (8 bytes per
+    value, no per-row objects); other columns are plain lists. Rows come
+    back as tuples, or as model objects through get()/objects().
+    """
+    
+    def __init__(self, model, columns, typecodes=None):
+        self.model = model
+        self.columns = list(columns)
+        typecodes = typecodes or {}
+        self._data = [array(typecodes[name]) if name in typecodes else [] for name in self.columns]
+    
+    @classmethod
+    def from_cursor(cls, cursor, model, typecodes=None, batch_size=10000):
+        """Fill from an executed cursor, batch_size rows at a time"""
+        rows = cls(model, [description[0] for description in cursor.description], typecodes)
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            rows.extend(batch)
+        return rows
+    
+    def extend(self, batch):
+        for data, values in zip(self._data, zip(*batch)):
+            data.extend(values)
+    
+    def __len__(self):
+        return len(self._data[0]) if self._data else 0
+    
+    def __getitem__(self, index):
+        return tuple(data[index] for data in self._data)
+    
+    def __iter__(self):
+        return zip(*self._data)
+    
+    def column(self, name):
+        """The whole column as an array or list"""
+        return self._data[self.columns.index(name)]
+    
+    def get(self, index):
+        """Row at index as a model object"""
+        return self.model.from_db_row(self[index])
+    
+    def objects(self):
+        """Iterate the rows as model objects, built one at a time"""
+        from_db_row = self.model.from_db_row
+        for row in self:
+            yield from_db_row(row)
@@ -0,0 +1,93 @@
+import sqlite3
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+class _SearchSignals(QObject):
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+class _SearchTask(QRunnable):
+    def __init__(self, controller, generation, search):
+        super().__init__()
+        self.controller = controller
+        self.generation = generation
+        self.search = search
+    
+    def run(self):
+        controller = self.controller
+        if controller.is_stale(self.generation):
+            return
+        
+        # Worker threads get their own thread-local connection
+        conn = controller.db.get_connection()
+        # Abort the query as soon as a newer search supersedes it
+        conn.set_progress_handler(lambda: controller.is_stale(self.generation), 1000)
+        try:
+            results = self.search()
+        except sqlite3.OperationalError as e:
+            if not controller.is_stale(self.generation):
+                controller.signals.failed.emit(self.generation, str(e))
+            return
+        except Exception as e:
+            controller.signals.failed.emit(self.generation, str(e))
+            return
+        finally:
+            conn.set_progress_handler(None, 0)
+        
+        controller.signals.finished.emit(self.generation, results)
+
+class SearchController(QObject):
+    """Debounces search requests and runs them off the GUI thread.
+    
+    Only the newest request is delivered; older ones are skipped before they
+    start or interrupted while their query runs.
+    """
+    results_ready = pyqtSignal(object)
+    search_failed = pyqtSignal(str)
+    
+    def __init__(self, db, delay_ms=250, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self._generation = 0
+        self._pending = None
+        
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self._start_pending)
+        
+        # One worker is enough, stale tasks exit straight away
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        
+        self.signals = _SearchSignals()
+        self.signals.finished.connect(self._on_finished)
+        self.signals.failed.connect(self._on_failed)
+    
+    def request(self, search):
+        """Schedule search (a no-argument callable run on the worker thread)"""
+        self._generation += 1
+        self._pending = search
+        self._timer.start()
+    
+    def cancel(self):
+        """Drop the pending search and any result still in flight"""
+        self._generation += 1
+        self._pending = None
+        self._timer.stop()
+    
+    def is_stale(self, generation):
+        return generation != self._generation
+    
+    def _start_pending(self):
+        if self._pending is None:
+            return
+        search, self._pending = self._pending, None
+        self._pool.start(_SearchTask(self, self._generation, search))
+    
+    def _on_finished(self, generation, results):
+        if not self.is_stale(generation):
+            self.results_ready.emit(results)
+    
+    def _on_failed(self, generation, message):
+        if not self.is_stale(generation):
+            self.search_failed.emit(message)
@@ -0,0 +1,111 @@
+from PyQt6.QtWidgets import QTableView, QAbstractItemView, QHeaderView
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+class RowTableModel(QAbstractTableModel):
+    """Read-only table model over a list of plain row tuples.
+    
+    Cells are formatted on demand in data(), so the view only pays for the
+    rows that are actually on screen.
+    """
+    
+    def __init__(self, headers, formatters=None, parent=None):
+        super().__init__(parent)
+        self._headers = list(headers)
+        # Column index -> callable turning the raw value into display text
+        self._formatters = formatters or {}
+        self._rows = []
+        # Record id -> row position, built on first incremental update
+        self._positions = None
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        value = self._rows[index.row()][index.column()]
+        formatter = self._formatters.get(index.column())
+        if formatter:
+            return formatter(value)
+        return "" if value is None else str(value)
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self._headers[section]
+        return str(section + 1)
+    
+    def set_rows(self, rows):
+        """Replace all rows, rows is a list of tuples"""
+        self.beginResetModel()
+        self._rows = rows if isinstance(rows, list) else list(rows)
+        self._positions = None
+        self.endResetModel()
+    
+    def _position_map(self):
+        if self._positions is None:
+            self._positions = {row[0]: position for position, row in enumerate(self._rows)}
+        return self._positions
+    
+    def update_rows(self, rows, append_missing=False):
+        """Replace rows in place by id, optionally appending unknown ids"""
+        positions = self._position_map()
+        new_rows = []
+        for row in rows:
+            position = positions.get(row[0])
+            if position is None:
+                if append_missing:
+                    new_rows.append(row)
+                continue
+            self._rows[position] = row
+            self.dataChanged.emit(self.index(position, 0),
+                                  self.index(position, len(self._headers) - 1))
+        
+        if new_rows:
+            start = len(self._rows)
+            self.beginInsertRows(QModelIndex(), start, start + len(new_rows) - 1)
+            self._rows.extend(new_rows)
+            for offset, row in enumerate(new_rows):
+                positions[row[0]] = start + offset
+            self.endInsertRows()
+    
+    def remove_ids(self, ids):
+        """Remove the rows with the given ids"""
+        positions = self._position_map()
+        # Highest position first so earlier positions stay valid
+        for position in sorted((positions[i] for i in ids if i in positions), reverse=True):
+            self.beginRemoveRows(QModelIndex(), position, position)
+            del self._rows[position]
+            self.endRemoveRows()
+        self._positions = None
+    
+    def row(self, row):
+        return self._rows[row]
+    
+    def row_id(self, row):
+        """First column holds the record id"""
+        return self._rows[row][0]
+
+
+def create_table_view(model, stretch=True):
+    """QTableView set up the way the tabs use their tables"""
+    view = QTableView()
+    view.setModel(model)
+    view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+    view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+    view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+    # Fixed row height lets Qt skip measuring every row
+    view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+    if stretch:
+        view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+    return view
+
+
+def current_row(view):
+    """Selected row index, or -1 like QTableWidget.currentRow()"""
+    index = view.currentIndex()
+    return index.row() if index.isValid() else -1
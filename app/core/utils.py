@@ -1,26 +1,65 @@
 from datetime import datetime, date
+from decimal import Decimal, ROUND_HALF_UP
 import json
+import os
+import re
+import socket
 
-def format_currency(amount):
-    return f"₱{amount:.2f}"
+def format_currency(cents):
+    """Integer centavos as ₱1234.50"""
+    # cents / 100 is the double nearest the exact value, so rounding it to
+    # two places is exact for any realistic amount and faster than divmod
+    return f"₱{cents / 100:.2f}"
+
+def format_amount(cents):
+    """Integer centavos as 1234.50, the form the price inputs accept"""
+    return f"{cents / 100:.2f}"
+
+def format_days(days):
+    """Days of stock cover to one decimal, '-' for items that are not selling"""
+    return "-" if days is None else f"{days:.1f}"
+
+def to_cents(amount):
+    """Pesos as text, int, float or Decimal to integer centavos, half up"""
+    return int((Decimal(str(amount).strip()) * 100).quantize(Decimal(1), ROUND_HALF_UP))
 
 def get_current_date():
     return date.today().isoformat()
 
+# Largest accepted price in pesos and stock count, far past any real value
+# but small enough that to_cents and SQLite INTEGER columns cannot overflow
+MAX_PRICE = Decimal("999999999.99")
+MAX_STOCK = 10 ** 9
+
 def validate_price(price_str):
     try:
-        price = float(price_str)
-        return price >= 0
-    except ValueError:
+        price = Decimal(price_str)
+        return price.is_finite() and 0 <= price <= MAX_PRICE
+    except (ArithmeticError, ValueError):
         return False
 
 def validate_stock(stock_str):
     try:
         stock = int(stock_str)
-        return stock >= 0
+        return 0 <= stock <= MAX_STOCK
     except ValueError:
         return False
 
+def default_terminal_id():
+    """POS_TERMINAL_ID if set, otherwise the host name
+    
+    Stable across restarts, so a new run finds the holds and journal its
+    previous run left. Set POS_TERMINAL_ID when a host runs two terminals.
+    """
+    return os.environ.get("POS_TERMINAL_ID") or socket.gethostname()
+
+def fts_prefix_query(search_term):
+    """Turn free text into an FTS5 query matching every word as a prefix"""
+    words = re.findall(r"\w+", search_term or "")
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
 def serialize_items(items):
     return json.dumps(items)
 
@@ -0,0 +1,46 @@
+"""Detects commits by other processes from table_versions and data_version"""
+import threading
+
+from core.events import ChangeEvent, UPDATE
+
+class ExternalChangeMonitor:
+    """Turns other terminals' commits into ChangeEvents on db.events.
+    
+    poll() costs one PRAGMA data_version while nothing was committed. After
+    a commit it reads table_versions and publishes a bulk ChangeEvent
+    (ids=None) for every table whose counter moved, so caches and tabs
+    reload through the handlers they already have. db.transaction() reports
+    the counters it saw before and after each local write; they are only
+    taken as known when nobody else committed to the table in between, so
+    this process's own writes (which published their own events) are not
+    reported again and other terminals' commits are never hidden.
+    """
+    
+    def __init__(self, db):
+        self.db = db
+        self._lock = threading.Lock()
+        self._data_version = db.data_version()
+        self._known = db.table_versions()
+    
+    def poll(self):
+        """Publish events for tables changed elsewhere, returns their names"""
+        data_version = self.db.data_version()
+        if data_version == self._data_version:
+            return []
+        self._data_version = data_version
+        
+        versions = self.db.table_versions()
+        with self._lock:
+            changed = [table for table, version in versions.items() if version > self._known.get(table, -1)]
+            self._known.update((table, versions[table]) for table in changed)
+        for table in changed:
+            self.db.events.publish(ChangeEvent(table, UPDATE))
+        return changed
+    
+    def local_commit(self, before, after):
+        """Take the counters moved by a local transaction as known"""
+        with self._lock:
+            for table, version in after.items():
+                # A gap means another process committed before this write
+                if version != before.get(table) and self._known.get(table) == before.get(table):
+                    self._known[table] = version
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""Single-writer queue that batches write jobs into group commits"""
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+
+_STOP = object()
+
+
+class WriteQueue:
+    """Runs write jobs on one thread, many jobs per transaction.
+    
+    submit() returns a Future right away. The writer takes every job that is
+    waiting, lingers up to max_latency_ms for more (never past max_batch) and
+    commits them together, so N concurrent sales cost one commit instead of
+    N. Each job runs in its own savepoint: a failing job is rolled back and
+    gets the exception, the rest of the batch still commits.
+    """
+    
+    def __init__(self, db, max_batch=64, max_latency_ms=2):
+        self.db = db
+        self.max_batch = max_batch
+        self.max_latency = max_latency_ms / 1000
+        self._jobs = queue.SimpleQueue()
+        # Batches committed and jobs written, for benchmarks and diagnostics
+        self.batches = 0
+        self.jobs = 0
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+    
+    def submit(self, job, after_commit=None):
+        """Queue job(cursor), the Future resolves to its return value
+        
+        after_commit(result) runs on the writer thread once the batch is
+        committed, before the Future is resolved.
+        """
+        future = Future()
+        self._jobs.put((job, after_commit, future))
+        return future
+    
+    def close(self):
+        """Write what is queued, then stop the writer thread"""
+        self._jobs.put(_STOP)
+        self._thread.join()
+    
+    def _next_batch(self):
+        """Block for one job, then gather more until full or the deadline"""
+        batch = [self._jobs.get()]
+        deadline = time.monotonic() + self.max_latency
+        while len(batch) < self.max_batch and batch[-1] is not _STOP:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._jobs.get(timeout=remaining))
+                else:
+                    batch.append(self._jobs.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            stopping = batch[-1] is _STOP
+            if stopping:
+                batch.pop()
+            if batch:
+                self._commit(batch)
+            if stopping:
+                self.db.release_connection()
+                return
+    
+    def _commit(self, batch):
+        done = []
+        try:
+            with self.db.transaction(immediate=True):
+                for job, after_commit, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        # Nested transaction() is a savepoint per job
+                        with self.db.transaction() as job_cursor:
+                            result = job(job_cursor)
+                    except Exception as e:
+                        future.set_exception(e)
+                    else:
+                        done.append((after_commit, future, result))
+        except Exception as e:
+            # The transaction failed as a whole, nothing in the batch was written
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        self.batches += 1
+        self.jobs += len(done)
+        for after_commit, future, result in done:
+            if after_commit is not None:
+                try:
+                    after_commit(result)
+                except Exception:
+                    # The job is committed either way, keep the writer alive
+                    traceback.print_exc()
+            future.set_result(result)
\ No newline at end of file
@@ -0,0 +1,19 @@
+class DashboardStats:
+    def __init__(self, total_sales_today, inventory_count, low_stock_count, services_count):
+        self.total_sales_today = total_sales_today
+        self.inventory_count = inventory_count
+        self.low_stock_count = low_stock_count
+        self.services_count = services_count
+    
+    @classmethod
+    def from_db_row(cls, row):
+        return cls(row[0], row[1], row[2], row[3])
+
+class DashboardSnapshot:
+    """Everything one dashboard refresh shows, collected off the GUI thread"""
+    
+    def __init__(self, stats, low_stock_rows):
+        self.stats = stats
+        self.low_stock_rows = low_stock_rows  # Tuple of row tuples
+        # Hashed on the worker so the view only compares two ints
+        self.low_stock_checksum = hash(low_stock_rows)
\ No newline at end of file
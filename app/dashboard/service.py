@@ -0,0 +1,62 @@
+import threading
+
+from core.utils import get_current_date
+from inventory.replenishment import ReplenishmentService
+from .models import DashboardStats, DashboardSnapshot
+
+class DashboardService:
+    def __init__(self, db):
+        self.db = db
+        self.replenishment = ReplenishmentService(db)
+        self._low_stock_items = None
+        # Bumped on every inventory change, guarded by _cache_lock
+        self._cache_generation = 0
+        self._cache_lock = threading.Lock()
+        # Drop the cached low stock list whenever inventory changes
+        db.events.subscribe(self._on_change)
+    
+    def get_stats(self):
+        """Get every dashboard counter in one aggregate query"""
+        with self.db.read_connection() as conn:
+            row = conn.execute('''
+                SELECT
+                    (SELECT COALESCE(SUM(revenue), 0) FROM daily_sales_summary WHERE sale_date = ?),
+                    (SELECT COUNT(*) FROM inventory),
+                    (SELECT COUNT(*) FROM item_replenishment WHERE below_reorder = 1),
+                    (SELECT COUNT(*) FROM services)
+            ''', (get_current_date(),)).fetchone()
+        return DashboardStats.from_db_row(row)
+    
+    def get_low_stock_items(self):
+        """(InventoryItem, ItemReplenishment) below their reorder point, cached until the next inventory change"""
+        items = self._low_stock_items
+        if items is None:
+            generation = self._cache_generation
+            items = self.replenishment.get_below_reorder()
+            with self._cache_lock:
+                # Runs on the refresh worker, a change meanwhile makes this list stale
+                if generation == self._cache_generation:
+                    self._low_stock_items = items
+        return items
+    
+    def get_snapshot(self):
+        """Stats and low stock table rows for one refresh, safe to call from a worker thread"""
+        # First refresh of a new day lets yesterday's velocities decay
+        if self.replenishment.close_days():
+            self._invalidate()
+        stats = self.get_stats()
+        rows = tuple(
+            (item.id, item.name, item.category, item.price, item.stock,
+             status.reorder_point, status.days_of_cover)
+            for item, status in self.get_low_stock_items()
+        )
+        return DashboardSnapshot(stats, rows)
+    
+    def _invalidate(self):
+        with self._cache_lock:
+            self._cache_generation += 1
+            self._low_stock_items = None
+    
+    def _on_change(self, event):
+        if event.entity == 'inventory':
+            self._invalidate()
\ No newline at end of file
@@ -1,19 +1,25 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
-                            QLabel, QTableWidget, QTableWidgetItem, QGroupBox,
-                            QHeaderView)
+                            QLabel, QGroupBox)
 from PyQt6.QtCore import Qt, QTimer
-from inventory.service import InventoryService
-from sales.service import SalesService
-from services.service import ServicesService
-from core.utils import format_currency
+from .service import DashboardService
+from .worker import DashboardRefresher
+from core.utils import format_currency, format_days
+from core.table_model import RowTableModel, create_table_view
+from core.qt_events import ChangeRelay
 
 class DashboardTab(QWidget):
     def __init__(self, db):
         super().__init__()
         self.db = db
-        self.inventory_service = InventoryService(db)
-        self.sales_service = SalesService(db)
-        self.services_service = ServicesService(db)
+        self.dashboard_service = DashboardService(db)
+        self._refresh_pending = False
+        # Checksum of the rows on screen, None until the first snapshot
+        self._low_stock_checksum = None
+        self.refresher = DashboardRefresher(self.dashboard_service, self)
+        self.refresher.snapshot_ready.connect(self.show_snapshot)
+        self.refresher.refresh_failed.connect(self.show_refresh_error)
+        self.changes = ChangeRelay(db.events, self)
+        self.changes.changed.connect(self.apply_change)
         self.init_ui()
         self.refresh_data()
         
@@ -26,6 +32,7 @@ class DashboardTab(QWidget):
         
         # Stats grid
         stats_group = QGroupBox("Today's Overview")
+        self.stats_group = stats_group
         stats_layout = QGridLayout()
         
         self.sales_label = self.create_stat_box("Total Sales Today", "₱0.00")
@@ -42,14 +49,14 @@ class DashboardTab(QWidget):
         layout.addWidget(stats_group)
         
         # Low stock alerts
-        alerts_group = QGroupBox("Low Stock Alerts (Stock < 5)")
+        alerts_group = QGroupBox("Low Stock Alerts (at or below reorder point)")
         alerts_layout = QVBoxLayout()
         
-        self.low_stock_table = QTableWidget()
-        self.low_stock_table.setColumnCount(5)
-        self.low_stock_table.setHorizontalHeaderLabels(["ID", "Name", "Category", "Price", "Stock"])
-        header = self.low_stock_table.horizontalHeader()
-        header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.low_stock_model = RowTableModel(
+            ["ID", "Name", "Category", "Price", "Stock", "Reorder At", "Days Left"],
+            {3: format_currency, 6: format_days}
+        )
+        self.low_stock_table = create_table_view(self.low_stock_model)
         alerts_layout.addWidget(self.low_stock_table)
         
         alerts_group.setLayout(alerts_layout)
@@ -66,27 +73,38 @@ class DashboardTab(QWidget):
         group.setLayout(layout)
         return group
     
+    def apply_change(self, event):
+        # Renames and description edits do not affect any dashboard figure
+        if event.entity != 'sales' and not event.touches('category', 'price', 'stock'):
+            return
+        # A checkout publishes several events, refresh once for all of them
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            QTimer.singleShot(0, self._refresh_after_change)
+    
+    def _refresh_after_change(self):
+        self._refresh_pending = False
+        self.refresh_data()
+    
     def refresh_data(self):
-        # Update stats
-        total_sales = self.sales_service.get_total_sales_today()
-        self.sales_label.layout().itemAt(0).widget().setText(format_currency(total_sales))
-        
-        inventory_count = len(self.inventory_service.get_all_items())
-        self.inventory_label.layout().itemAt(0).widget().setText(str(inventory_count))
-        
-        low_stock_count = len(self.inventory_service.get_low_stock_items())
-        self.low_stock_label.layout().itemAt(0).widget().setText(str(low_stock_count))
-        
-        services_count = len(self.services_service.get_all_services())
-        self.services_label.layout().itemAt(0).widget().setText(str(services_count))
+        """Collect fresh figures on the worker thread, show_snapshot applies them"""
+        self.refresher.request()
+    
+    def show_snapshot(self, snapshot):
+        self.stats_group.setTitle("Today's Overview")
         
-        # Update low stock table
-        low_stock_items = self.inventory_service.get_low_stock_items()
-        self.low_stock_table.setRowCount(len(low_stock_items))
+        # Update stats
+        stats = snapshot.stats
+        self.sales_label.layout().itemAt(0).widget().setText(format_currency(stats.total_sales_today))
+        self.inventory_label.layout().itemAt(0).widget().setText(str(stats.inventory_count))
+        self.low_stock_label.layout().itemAt(0).widget().setText(str(stats.low_stock_count))
+        self.services_label.layout().itemAt(0).widget().setText(str(stats.services_count))
         
-        for row, item in enumerate(low_stock_items):
-            self.low_stock_table.setItem(row, 0, QTableWidgetItem(str(item.id)))
-            self.low_stock_table.setItem(row, 1, QTableWidgetItem(item.name))
-            self.low_stock_table.setItem(row, 2, QTableWidgetItem(item.category))
-            self.low_stock_table.setItem(row, 3, QTableWidgetItem(format_currency(item.price)))
-            self.low_stock_table.setItem(row, 4, QTableWidgetItem(str(item.stock)))
\ No newline at end of file
+        # Update low stock table, a model reset loses the selection and scroll position
+        if snapshot.low_stock_checksum != self._low_stock_checksum:
+            self._low_stock_checksum = snapshot.low_stock_checksum
+            self.low_stock_model.set_rows(list(snapshot.low_stock_rows))
+    
+    def show_refresh_error(self, message):
+        # Keep the last figures, the next tick tries again
+        self.stats_group.setTitle(f"Today's Overview (not updated: {message})")
\ No newline at end of file
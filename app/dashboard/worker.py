@@ -0,0 +1,64 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+class _RefreshSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+class _RefreshTask(QRunnable):
+    def __init__(self, service, signals):
+        super().__init__()
+        self.service = service
+        self.signals = signals
+    
+    def run(self):
+        try:
+            snapshot = self.service.get_snapshot()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(snapshot)
+
+class DashboardRefresher(QObject):
+    """Collects dashboard snapshots on a worker thread.
+    
+    At most one refresh runs at a time; requests made while it runs are
+    folded into a single follow-up refresh, so a burst of sales or timer
+    ticks never queues up queries.
+    """
+    snapshot_ready = pyqtSignal(object)
+    refresh_failed = pyqtSignal(str)
+    
+    def __init__(self, service, parent=None):
+        super().__init__(parent)
+        self.service = service
+        self._running = False
+        self._requested = False
+        
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        
+        self.signals = _RefreshSignals()
+        self.signals.finished.connect(self._on_finished)
+        self.signals.failed.connect(self._on_failed)
+    
+    def request(self):
+        """Refresh now, or right after the refresh in flight"""
+        if self._running:
+            self._requested = True
+            return
+        self._running = True
+        self._pool.start(_RefreshTask(self.service, self.signals))
+    
+    def _on_finished(self, snapshot):
+        self._done()
+        self.snapshot_ready.emit(snapshot)
+    
+    def _on_failed(self, message):
+        self._done()
+        self.refresh_failed.emit(message)
+    
+    def _done(self):
+        self._running = False
+        if self._requested:
+            self._requested = False
+            self.request()
\ No newline at end of file
@@ -0,0 +1,10 @@
+class ExportResult:
+    def __init__(self, table, path, rows, seconds):
+        self.table = table
+        self.path = path
+        self.rows = rows
+        self.seconds = seconds
+    
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
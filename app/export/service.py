@@ -0,0 +1,89 @@
+import csv
+import time
+from .models import ExportResult
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# table -> (query, [(column, type)]), types are 'int', 'float' or 'str'.
+# Money is exported as exact integer centavos in *_cents columns
+EXPORTS = {
+    'sales': (
+        '''
+        SELECT s.id, s.sale_date, s.customer_name, s.total_amount,
+               si.item_type, si.item_id, si.name, si.quantity, si.unit_price, si.line_total
+        FROM sales s LEFT JOIN sale_items si ON si.sale_id = s.id
+        ORDER BY s.id, si.id
+        ''',
+        [('sale_id', 'int'), ('sale_date', 'str'), ('customer_name', 'str'), ('sale_total_cents', 'int'),
+         ('item_type', 'str'), ('item_id', 'int'), ('name', 'str'), ('quantity', 'int'),
+         ('unit_price_cents', 'int'), ('line_total_cents', 'int')]
+    ),
+    'inventory': (
+        "SELECT id, sku, name, brand, category, price, stock FROM inventory ORDER BY id",
+        [('id', 'int'), ('sku', 'str'), ('name', 'str'), ('brand', 'str'), ('category', 'str'),
+         ('price_cents', 'int'), ('stock', 'int')]
+    ),
+    'services': (
+        "SELECT id, name, category, price, description FROM services ORDER BY id",
+        [('id', 'int'), ('name', 'str'), ('category', 'str'), ('price_cents', 'int'), ('description', 'str')]
+    ),
+}
+
+class ExportService:
+    def __init__(self, db, batch_size=5000):
+        self.db = db
+        self.batch_size = batch_size
+    
+    def iter_batches(self, table):
+        """Yield lists of rows for an export table, batch_size rows at a time"""
+        query, columns = EXPORTS[table]
+        # SQLite steps the cursor lazily, only one batch is held in memory.
+        # A read-only connection keeps its snapshot without blocking checkouts
+        with self.db.read_connection() as conn:
+            cursor = conn.execute(query)
+            try:
+                while True:
+                    rows = cursor.fetchmany(self.batch_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                cursor.close()
+    
+    def export_csv(self, table, path):
+        """Stream a table to a CSV file with a header row"""
+        columns = [name for name, _ in EXPORTS[table][1]]
+        start = time.perf_counter()
+        count = 0
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for rows in self.iter_batches(table):
+                writer.writerows(rows)
+                count += len(rows)
+        return ExportResult(table, path, count, time.perf_counter() - start)
+    
+    def export_parquet(self, table, path):
+        """Stream a table to a Parquet file, one row group per batch"""
+        if pyarrow is None:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+        
+        arrow_types = {'int': pyarrow.int64(), 'float': pyarrow.float64(), 'str': pyarrow.string()}
+        columns = EXPORTS[table][1]
+        schema = pyarrow.schema([(name, arrow_types[kind]) for name, kind in columns])
+        
+        start = time.perf_counter()
+        count = 0
+        with pyarrow.parquet.ParquetWriter(path, schema, compression='zstd') as writer:
+            for rows in self.iter_batches(table):
+                arrays = [
+                    pyarrow.array(values, type=field.type)
+                    for values, field in zip(zip(*rows), schema)
+                ]
+                writer.write_table(pyarrow.Table.from_arrays(arrays, schema=schema))
+                count += len(rows)
+        return ExportResult(table, path, count, time.perf_counter() - start)
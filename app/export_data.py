@@ -0,0 +1,24 @@
+import argparse
+from core.db import DatabaseManager
+from export.service import ExportService, EXPORTS
+
+def main():
+    parser = argparse.ArgumentParser(description="Export sales, inventory or services")
+    parser.add_argument("table", choices=sorted(EXPORTS))
+    parser.add_argument("output", help="file to write")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--db", default="data/app.db", help="database path")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    
+    exporter = ExportService(DatabaseManager(args.db), args.batch_size)
+    if args.format == "csv":
+        result = exporter.export_csv(args.table, args.output)
+    else:
+        result = exporter.export_parquet(args.table, args.output)
+    
+    print(f"✅ Exported {result.rows:,} {result.table} rows to {result.path} "
+          f"in {result.seconds:.2f} s ({result.rows_per_second:,.0f} rows/s)")
+
+if __name__ == "__main__":
+    main()
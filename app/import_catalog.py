@@ -0,0 +1,30 @@
+import argparse
+from core.db import DatabaseManager
+from importer.service import CatalogImporter
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import a supplier CSV price list")
+    parser.add_argument("table", choices=["inventory", "services"])
+    parser.add_argument("csv_file")
+    parser.add_argument("--db", default="data/app.db", help="database path")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+    
+    importer = CatalogImporter(
+        DatabaseManager(args.db), args.chunk_size,
+        progress=lambda done: print(f"  {done:,} rows...", end="\r")
+    )
+    if args.table == "inventory":
+        result = importer.import_inventory(args.csv_file)
+    else:
+        result = importer.import_services(args.csv_file)
+    
+    print(f"✅ {result.inserted:,} added, {result.updated:,} updated, "
+          f"{len(result.rejected):,} rejected in {result.seconds:.2f} s")
+    for rejected in result.rejected[:20]:
+        print(f"  line {rejected.line_number}: {rejected.reason}")
+    if len(result.rejected) > 20:
+        print(f"  ... and {len(result.rejected) - 20:,} more")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+class RejectedRow:
+    def __init__(self, line_number, reason, row):
+        self.line_number = line_number
+        self.reason = reason
+        self.row = row
+
+class ImportResult:
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.rejected = []
+        self.seconds = 0.0
+    
+    @property
+    def processed(self):
+        return self.inserted + self.updated + len(self.rejected)
@@ -0,0 +1,161 @@
+import csv
+import time
+from core.utils import validate_price, validate_stock, to_cents
+from core.events import ChangeEvent, UPDATE
+from .models import ImportResult, RejectedRow
+
+class CatalogImporter:
+    """Bulk upsert of supplier CSV price lists into inventory and services.
+    
+    Rows are matched on a natural key (name + brand for inventory, name +
+    category for services, case-insensitive) and written with executemany,
+    one transaction per chunk.
+    """
+    
+    def __init__(self, db, chunk_size=5000, progress=None):
+        self.db = db
+        self.chunk_size = chunk_size
+        # Called with the number of CSV rows handled so far
+        self.progress = progress
+    
+    def import_inventory(self, path):
+        """Import a CSV with name, brand, category, price and optional stock and sku columns"""
+        return self._import(path, 'inventory', self._parse_inventory_row)
+    
+    def import_services(self, path):
+        """Import a CSV with name, category, price and optional description columns"""
+        return self._import(path, 'services', self._parse_service_row)
+    
+    def _parse_inventory_row(self, row):
+        name = (row.get('name') or '').strip()
+        brand = (row.get('brand') or '').strip()
+        category = (row.get('category') or '').strip()
+        price = (row.get('price') or '').strip()
+        stock = (row.get('stock') or '').strip()
+        sku = (row.get('sku') or '').strip()
+        
+        if not name:
+            raise ValueError("name is required")
+        if not validate_price(price):
+            raise ValueError(f"invalid price {price!r}")
+        if stock and not validate_stock(stock):
+            raise ValueError(f"invalid stock {stock!r}")
+        
+        key = (name.lower(), brand.lower())
+        # Blank stock or sku keeps the current value of existing items
+        return key, (name, brand, category, to_cents(price), int(stock) if stock else None, sku or None)
+    
+    def _parse_service_row(self, row):
+        name = (row.get('name') or '').strip()
+        category = (row.get('category') or '').strip()
+        price = (row.get('price') or '').strip()
+        description = (row.get('description') or '').strip()
+        
+        if not name:
+            raise ValueError("name is required")
+        if not validate_price(price):
+            raise ValueError(f"invalid price {price!r}")
+        
+        key = (name.lower(), category.lower())
+        return key, (name, category, to_cents(price), description)
+    
+    def _load_keys(self, cursor, table, after_id=0):
+        if table == 'inventory':
+            cursor.execute(
+                "SELECT id, LOWER(name), LOWER(COALESCE(brand, '')) FROM inventory WHERE id > ?", (after_id,)
+            )
+        else:
+            cursor.execute(
+                "SELECT id, LOWER(name), LOWER(COALESCE(category, '')) FROM services WHERE id > ?", (after_id,)
+            )
+        return {(name, second): row_id for row_id, name, second in cursor.fetchall()}
+    
+    def _load_sku_owners(self, cursor):
+        cursor.execute(
+            "SELECT sku, LOWER(name), LOWER(COALESCE(brand, '')) FROM inventory WHERE sku IS NOT NULL"
+        )
+        return {sku: (name, brand) for sku, name, brand in cursor.fetchall()}
+    
+    def _import(self, path, table, parse_row):
+        start = time.perf_counter()
+        result = ImportResult()
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        existing = self._load_keys(cursor, table)
+        # SKUs are unique, reject rows that would take another item's code
+        sku_owners = self._load_sku_owners(cursor) if table == 'inventory' else None
+        
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+            chunk = {}
+            # Header is line 1
+            for line_number, row in enumerate(reader, start=2):
+                try:
+                    key, values = parse_row(row)
+                    if sku_owners is not None and values[5]:
+                        if sku_owners.setdefault(values[5], key) != key:
+                            raise ValueError(f"SKU {values[5]!r} already belongs to another item")
+                except ValueError as e:
+                    result.rejected.append(RejectedRow(line_number, str(e), row))
+                    continue
+                # Later rows for the same key win within a chunk
+                chunk[key] = values
+                if len(chunk) >= self.chunk_size:
+                    self._write_chunk(table, chunk, existing, result)
+                    chunk = {}
+                    if self.progress:
+                        self.progress(line_number - 1)
+            
+            if chunk:
+                self._write_chunk(table, chunk, existing, result)
+            if self.progress:
+                self.progress(result.processed)
+        
+        result.seconds = time.perf_counter() - start
+        if result.inserted or result.updated:
+            self.db.events.publish(ChangeEvent(table, UPDATE))
+        return result
+    
+    def _write_chunk(self, table, chunk, existing, result):
+        updates = []
+        inserts = []
+        for key, values in chunk.items():
+            row_id = existing.get(key)
+            if row_id is None:
+                inserts.append(values)
+            else:
+                updates.append(values + (row_id,))
+        
+        # Read-then-write: take the write lock before reading MAX(id)
+        with self.db.transaction(immediate=True) as cursor:
+            cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+            max_id = cursor.fetchone()[0]
+            
+            if table == 'inventory':
+                cursor.executemany(
+                    "UPDATE inventory SET name=?, brand=?, category=?, price=?, stock=COALESCE(?, stock), "
+                    "sku=COALESCE(?, sku) WHERE id=?",
+                    updates
+                )
+                cursor.executemany(
+                    "INSERT INTO inventory (name, brand, category, price, stock, sku) "
+                    "VALUES (?, ?, ?, ?, COALESCE(?, 0), ?)",
+                    inserts
+                )
+            else:
+                cursor.executemany(
+                    "UPDATE services SET name=?, category=?, price=?, description=? WHERE id=?",
+                    updates
+                )
+                cursor.executemany(
+                    "INSERT INTO services (name, category, price, description) VALUES (?, ?, ?, ?)",
+                    inserts
+                )
+            
+            # Later chunks must update, not re-insert, the rows added here
+            new_keys = self._load_keys(cursor, table, max_id)
+        
+        existing.update(new_keys)
+        result.inserted += len(inserts)
+        result.updated += len(updates)
@@ -1,12 +1,30 @@
 class InventoryItem:
-    def __init__(self, id, name, brand, category, price, stock):
+    __slots__ = ('id', 'name', 'brand', 'category', 'price', 'stock', 'sku')
+    
+    def __init__(self, id, name, brand, category, price, stock, sku=None):
         self.id = id
         self.name = name
         self.brand = brand
         self.category = category
-        self.price = price
+        self.price = price  # Integer centavos
         self.stock = stock
+        self.sku = sku
     
     @classmethod
     def from_db_row(cls, row):
-        return cls(row[0], row[1], row[2], row[3], row[4], row[5])
\ No newline at end of file
+        # Rows from ITEM_COLUMNS, sku is the 7th column
+        return cls(row[0], row[1], row[2], row[3], row[4], row[5], row[6] if len(row) > 6 else None)
+
+class ItemReplenishment:
+    __slots__ = ('item_id', 'daily_demand', 'reorder_point', 'stock')
+    
+    def __init__(self, item_id, daily_demand, reorder_point, stock):
+        self.item_id = item_id
+        self.daily_demand = daily_demand  # Smoothed units sold per day
+        self.reorder_point = reorder_point
+        self.stock = stock
+    
+    @property
+    def days_of_cover(self):
+        """Days until the item runs out at the current rate, None if it is not selling"""
+        return self.stock / self.daily_demand if self.daily_demand > 0 else None
\ No newline at end of file
@@ -0,0 +1,143 @@
+import math
+from datetime import date
+
+from core.utils import get_current_date
+from .models import InventoryItem, ItemReplenishment
+
+# Demand is averaged over about four weeks; a reorder must cover a week of
+# supplier lead time plus three days of safety stock
+WINDOW_DAYS = 28
+LEAD_TIME_DAYS = 7
+SAFETY_DAYS = 3
+# Never below the old fixed "stock < 5" alert, so new items and items
+# without enough sales history still show up before they run out
+LOW_STOCK_MIN = 4
+
+class ReplenishmentService:
+    """Sales-velocity reorder points kept in item_replenishment.
+    
+    Daily units sold per item are smoothed with an exponentially weighted
+    moving average, so each sale only touches the rows of the items it
+    sold: units are added to the current day, and closing a day folds it
+    into the average (quiet days decay it). The reorder point covers the
+    lead time plus safety stock at that rate, and never drops below
+    LOW_STOCK_MIN. Triggers keep
+    item_replenishment.below_reorder in step with inventory.stock, so the
+    low stock list is a partial index lookup.
+    """
+    
+    def __init__(self, db, window_days=WINDOW_DAYS, lead_time_days=LEAD_TIME_DAYS, safety_days=SAFETY_DAYS):
+        self.db = db
+        self.alpha = 2 / (window_days + 1)
+        self.cover_days = lead_time_days + safety_days
+    
+    def _advance(self, velocity, day, units, today):
+        """Close every day before today, returns (velocity, day, units)"""
+        if day is None:
+            return velocity, today, 0
+        if today <= day:
+            # Same day, or a sale synced late from a terminal journal
+            return velocity, day, units
+        gap = (date.fromisoformat(today) - date.fromisoformat(day)).days
+        velocity = self.alpha * units + (1 - self.alpha) * velocity
+        # Days without sales in between count as zero
+        velocity *= (1 - self.alpha) ** (gap - 1)
+        return velocity, today, 0
+    
+    def _demand(self, velocity, units):
+        """Units per day to plan for, today counts once it beats the average"""
+        return max(velocity, self.alpha * units + (1 - self.alpha) * velocity)
+    
+    def _row_update(self, item_id, velocity, day, units):
+        demand = self._demand(velocity, units)
+        reorder_point = max(LOW_STOCK_MIN, math.ceil(demand * self.cover_days - 1e-9))
+        return (velocity, day, units, demand, reorder_point, item_id)
+    
+    def _write(self, cursor, updates):
+        # Setting reorder_point fires the trigger that refreshes below_reorder
+        cursor.executemany('''
+            UPDATE item_replenishment
+            SET velocity = ?, current_day = ?, current_units = ?, daily_demand = ?, reorder_point = ?
+            WHERE item_id = ?
+        ''', updates)
+    
+    def record_sale(self, cursor, sale_date, quantities):
+        """Add one sale's item quantities, inside the sale's transaction"""
+        if not quantities:
+            return
+        placeholders = ",".join("?" * len(quantities))
+        cursor.execute(
+            f"SELECT item_id, velocity, current_day, current_units FROM item_replenishment "
+            f"WHERE item_id IN ({placeholders})",
+            list(quantities)
+        )
+        updates = []
+        for item_id, velocity, day, units in cursor.fetchall():
+            velocity, day, units = self._advance(velocity, day, units, sale_date)
+            updates.append(self._row_update(item_id, velocity, day, units + quantities[item_id]))
+        self._write(cursor, updates)
+    
+    def close_days(self, today=None):
+        """Decay items with no sales yet today, returns how many changed
+        
+        Once done for the day this is one indexed read and no write.
+        """
+        today = today or get_current_date()
+        with self.db.read_connection() as conn:
+            if conn.execute("SELECT 1 FROM item_replenishment WHERE current_day < ? LIMIT 1", (today,)).fetchone() is None:
+                return 0
+        with self.db.transaction(immediate=True) as cursor:
+            cursor.execute(
+                "SELECT item_id, velocity, current_day, current_units FROM item_replenishment "
+                "WHERE current_day < ?",
+                (today,)
+            )
+            updates = [
+                self._row_update(item_id, *self._advance(velocity, day, units, today))
+                for item_id, velocity, day, units in cursor.fetchall()
+            ]
+            self._write(cursor, updates)
+        return len(updates)
+    
+    def rebuild(self, cursor, today=None):
+        """Recompute every item from sale_items, for migrations and repairs"""
+        today = today or get_current_date()
+        cursor.execute("INSERT OR IGNORE INTO item_replenishment (item_id) SELECT id FROM inventory")
+        cursor.execute("SELECT item_id FROM item_replenishment")
+        state = {item_id: (0.0, None, 0) for (item_id,) in cursor.fetchall()}
+        
+        cursor.execute('''
+            SELECT si.item_id, s.sale_date, SUM(si.quantity)
+            FROM sale_items si JOIN sales s ON s.id = si.sale_id
+            WHERE si.item_type = 'item' AND s.sale_date <= ?
+            GROUP BY si.item_id, s.sale_date
+            ORDER BY si.item_id, s.sale_date
+        ''', (today,))
+        for item_id, sale_date, quantity in cursor:
+            if item_id in state:
+                velocity, day, units = self._advance(*state[item_id], sale_date)
+                state[item_id] = (velocity, day, units + quantity)
+        
+        updates = []
+        for item_id, (velocity, day, units) in state.items():
+            if day is not None:
+                velocity, day, units = self._advance(velocity, day, units, today)
+            updates.append(self._row_update(item_id, velocity, day, units))
+        self._write(cursor, updates)
+        return len(updates)
+    
+    def get_below_reorder(self):
+        """(InventoryItem, ItemReplenishment) for every item at or below its reorder point, fewest days left first, items not selling last"""
+        with self.db.read_connection() as conn:
+            rows = conn.execute('''
+                SELECT i.id, i.name, i.brand, i.category, i.price, i.stock, i.sku,
+                       r.daily_demand, r.reorder_point
+                FROM item_replenishment r
+                JOIN inventory i ON i.id = r.item_id
+                WHERE r.below_reorder = 1
+                ORDER BY r.daily_demand = 0, i.stock / NULLIF(r.daily_demand, 0), i.stock
+            ''').fetchall()
+        return [
+            (InventoryItem.from_db_row(row), ItemReplenishment(row[0], row[7], row[8], row[5]))
+            for row in rows
+        ]
\ No newline at end of file
@@ -1,87 +1,134 @@
 from core.db import DatabaseManager
+from core.utils import fts_prefix_query
+from core.events import ChangeEvent, INSERT, UPDATE, DELETE
+from core.cache import shared_cache
 from .models import InventoryItem
+from .replenishment import ReplenishmentService
+
+# Column order expected by InventoryItem.from_db_row
+ITEM_COLUMNS = "id, name, brand, category, price, stock, sku"
 
 class InventoryService:
     def __init__(self, db):
         self.db = db
+        self.cache = shared_cache(db, 'inventory', self._load_all_items, self._load_items_by_ids, keys=('sku',))
     
     def get_all_items(self):
         """Get all inventory items"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM inventory ORDER BY name")
-        items = [InventoryItem.from_db_row(row) for row in cursor.fetchall()]
-        # REMOVED: conn.close()
-        return items
+        return self.cache.get_all()
     
     def get_item_by_id(self, item_id):
         """Get item by ID"""
+        return self.cache.get(item_id)
+    
+    def get_items_by_ids(self, item_ids):
+        """Get the items with the given IDs"""
+        return self.cache.get_many(list(item_ids))
+    
+    def get_items_by_category(self, category):
+        """Get all items in one category"""
+        return self.cache.get_by_category(category)
+    
+    def get_item_by_sku(self, sku):
+        """Get item by SKU/barcode, a dictionary lookup once the cache is warm
+        
+        Misses fall back to the indexed column, the code may have been
+        assigned on another terminal since the cache was filled.
+        """
+        sku = sku.strip() if sku else ""
+        if not sku:
+            return None
+        item = self.cache.get_by_key('sku', sku)
+        if item is None:
+            cursor = self.db.get_connection().cursor()
+            cursor.execute(f"SELECT {ITEM_COLUMNS} FROM inventory WHERE sku = ?", (sku,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            item = InventoryItem.from_db_row(row)
+            # Re-read the row on next access so the SKU index learns the code
+            self.cache.invalidate([item.id])
+        return item
+    
+    def _load_all_items(self):
         conn = self.db.get_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM inventory WHERE id = ?", (item_id,))
-        row = cursor.fetchone()
+        cursor.execute(f"SELECT {ITEM_COLUMNS} FROM inventory ORDER BY name")
+        items = [InventoryItem.from_db_row(row) for row in cursor.fetchall()]
         # REMOVED: conn.close()
-        return InventoryItem.from_db_row(row) if row else None
+        return items
     
-    def add_item(self, name, brand, category, price, stock):
-        """Add new inventory item"""
+    def _load_items_by_ids(self, item_ids):
+        if not item_ids:
+            return []
         conn = self.db.get_connection()
         cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO inventory (name, brand, category, price, stock) VALUES (?, ?, ?, ?, ?)",
-            (name, brand, category, price, stock)
-        )
-        conn.commit()
-        # REMOVED: conn.close()
+        placeholders = ",".join("?" * len(item_ids))
+        cursor.execute(f"SELECT {ITEM_COLUMNS} FROM inventory WHERE id IN ({placeholders})", item_ids)
+        return [InventoryItem.from_db_row(row) for row in cursor.fetchall()]
+    
+    def add_item(self, name, brand, category, price, stock, sku=None):
+        """Add new inventory item, raises sqlite3.IntegrityError if the SKU is taken"""
+        with self.db.transaction() as cursor:
+            cursor.execute(
+                "INSERT INTO inventory (name, brand, category, price, stock, sku) VALUES (?, ?, ?, ?, ?, ?)",
+                (name, brand, category, price, stock, sku or None)
+            )
+        self.db.events.publish(ChangeEvent('inventory', INSERT, [cursor.lastrowid]))
         return True
     
-    def update_item(self, item_id, name, brand, category, price, stock):
-        """Update inventory item"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE inventory SET name=?, brand=?, category=?, price=?, stock=? WHERE id=?",
-            (name, brand, category, price, stock, item_id)
-        )
-        conn.commit()
-        # REMOVED: conn.close()
+    def update_item(self, item_id, name, brand, category, price, stock, sku=None):
+        """Update inventory item, raises sqlite3.IntegrityError if the SKU is taken"""
+        with self.db.transaction() as cursor:
+            cursor.execute(
+                "UPDATE inventory SET name=?, brand=?, category=?, price=?, stock=?, sku=? WHERE id=?",
+                (name, brand, category, price, stock, sku or None, item_id)
+            )
+        self.db.events.publish(ChangeEvent('inventory', UPDATE, [item_id],
+                                           ['name', 'brand', 'category', 'price', 'stock', 'sku']))
         return True
     
     def delete_item(self, item_id):
         """Delete inventory item"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM inventory WHERE id=?", (item_id,))
-        conn.commit()
-        # REMOVED: conn.close()
+        with self.db.transaction() as cursor:
+            cursor.execute("DELETE FROM inventory WHERE id=?", (item_id,))
+        self.db.events.publish(ChangeEvent('inventory', DELETE, [item_id]))
         return True
     
     def search_items(self, search_term, category_filter=None):
-        """Search inventory items"""
+        """Search inventory items by name, brand and category, best matches first"""
+        match = fts_prefix_query(search_term)
+        if not match:
+            # Plain listing or category filter, served from the cache
+            if category_filter and category_filter != "All":
+                return self.get_items_by_category(category_filter)
+            return self.get_all_items()
+        
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
-        query = "SELECT * FROM inventory WHERE name LIKE ?"
-        params = [f'%{search_term}%']
+        query = (
+            "SELECT inventory.id, inventory.name, inventory.brand, inventory.category, "
+            "inventory.price, inventory.stock, inventory.sku FROM inventory_fts "
+            "JOIN inventory ON inventory.id = inventory_fts.rowid "
+            "WHERE inventory_fts MATCH ?"
+        )
+        params = [match]
         
         if category_filter and category_filter != "All":
-            query += " AND category = ?"
+            query += " AND inventory.category = ?"
             params.append(category_filter)
         
-        query += " ORDER BY name"
+        # Name hits outrank brand hits, which outrank category hits
+        query += " ORDER BY bm25(inventory_fts, 10.0, 5.0, 2.0), inventory.name"
         cursor.execute(query, params)
         items = [InventoryItem.from_db_row(row) for row in cursor.fetchall()]
         # REMOVED: conn.close()
         return items
     
-    def get_low_stock_items(self, threshold=5):
-        """Get items with low stock"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM inventory WHERE stock < ? ORDER BY stock", (threshold,))
-        items = [InventoryItem.from_db_row(row) for row in cursor.fetchall()]
-        # REMOVED: conn.close()
-        return items
+    def get_low_stock_items(self):
+        """Get items at or below their own reorder point"""
+        return [item for item, _ in ReplenishmentService(self.db).get_below_reorder()]
     
     def get_categories(self):
         """Get all unique categories"""
@@ -94,9 +141,7 @@ class InventoryService:
     
     def update_stock(self, item_id, new_stock):
         """Update item stock"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE inventory SET stock=? WHERE id=?", (new_stock, item_id))
-        conn.commit()
-        # REMOVED: conn.close()
+        with self.db.transaction() as cursor:
+            cursor.execute("UPDATE inventory SET stock=? WHERE id=?", (new_stock, item_id))
+        self.db.events.publish(ChangeEvent('inventory', UPDATE, [item_id], ['stock']))
         return True
\ No newline at end of file
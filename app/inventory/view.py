@@ -1,10 +1,16 @@
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, 
-                            QTableWidgetItem, QPushButton, QLineEdit, QComboBox,
-                            QLabel, QMessageBox, QDialog, QFormLayout, QDialogButtonBox,
-                            QSpinBox, QHeaderView)
+import csv
+import sqlite3
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit,
+                            QComboBox, QLabel, QMessageBox, QDialog, QFormLayout,
+                            QDialogButtonBox, QFileDialog, QProgressDialog, QApplication, QSpinBox)
 from PyQt6.QtCore import Qt, pyqtSignal
 from .service import InventoryService
-from core.utils import format_currency, validate_price
+from core.utils import format_currency, format_amount, to_cents, validate_price
+from core.table_model import RowTableModel, create_table_view, current_row
+from core.search import SearchController
+from core.qt_events import ChangeRelay
+from core.events import INSERT, UPDATE, DELETE
+from importer.service import CatalogImporter
 
 class InventoryTab(QWidget):
     data_updated = pyqtSignal()
@@ -13,6 +19,11 @@ class InventoryTab(QWidget):
         super().__init__()
         self.db = db
         self.inventory_service = InventoryService(db)
+        self.search_controller = SearchController(db, parent=self)
+        self.search_controller.results_ready.connect(self.populate_table)
+        self.search_controller.search_failed.connect(self.show_search_error)
+        self.changes = ChangeRelay(db.events, self)
+        self.changes.changed.connect(self.apply_change)
         self.init_ui()
         self.refresh_data()
     
@@ -37,11 +48,9 @@ class InventoryTab(QWidget):
         layout.addLayout(search_layout)
         
         # Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(["ID", "Name", "Brand", "Category", "Price", "Stock"])
-        header = self.table.horizontalHeader()
-        header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.model = RowTableModel(["ID", "SKU", "Name", "Brand", "Category", "Price", "Stock"],
+                                   {5: format_currency})
+        self.table = create_table_view(self.model)
         layout.addWidget(self.table)
         
         # Buttons
@@ -52,10 +61,13 @@ class InventoryTab(QWidget):
         self.edit_btn.clicked.connect(self.edit_item)
         self.delete_btn = QPushButton("Delete Item")
         self.delete_btn.clicked.connect(self.delete_item)
+        self.import_btn = QPushButton("Import CSV...")
+        self.import_btn.clicked.connect(self.import_csv)
         
         button_layout.addWidget(self.add_btn)
         button_layout.addWidget(self.edit_btn)
         button_layout.addWidget(self.delete_btn)
+        button_layout.addWidget(self.import_btn)
         button_layout.addStretch()
         layout.addLayout(button_layout)
         self.setLayout(layout)
@@ -69,61 +81,141 @@ class InventoryTab(QWidget):
         for category in categories:
             self.category_filter.addItem(category)
     
+    def refresh_categories(self):
+        """Reload the category filter, keeping the current choice"""
+        current = self.category_filter.currentText()
+        self.category_filter.blockSignals(True)
+        self.category_filter.clear()
+        self.category_filter.addItem("All Categories")
+        self.category_filter.addItems(self.inventory_service.get_categories())
+        index = self.category_filter.findText(current)
+        self.category_filter.setCurrentIndex(max(index, 0))
+        self.category_filter.blockSignals(False)
+    
+    def apply_change(self, event):
+        """Apply an inventory ChangeEvent to just the affected rows"""
+        if event.entity != 'inventory':
+            return
+        if event.ids is None:
+            # Changed elsewhere, reload through the active search and filter
+            self.refresh_categories()
+            self.search_items()
+            return
+        
+        filtered = self.search_input.text() or self.category_filter.currentIndex() > 0
+        if event.action == DELETE:
+            self.model.remove_ids(event.ids)
+        elif filtered and (event.action == INSERT or event.touches('name', 'brand', 'category')):
+            # Changed rows may now match the active search, or stop matching
+            self.search_items()
+        else:
+            items = self.inventory_service.get_items_by_ids(event.ids)
+            self.model.update_rows([self.item_row(item) for item in items],
+                                   append_missing=event.action == INSERT)
+        
+        if event.action != UPDATE or event.touches('category'):
+            self.refresh_categories()
+    
     def populate_table(self, items):
-        self.table.setRowCount(len(items))
-        for row, item in enumerate(items):
-            self.table.setItem(row, 0, QTableWidgetItem(str(item.id)))
-            self.table.setItem(row, 1, QTableWidgetItem(item.name))
-            self.table.setItem(row, 2, QTableWidgetItem(item.brand))
-            self.table.setItem(row, 3, QTableWidgetItem(item.category))
-            self.table.setItem(row, 4, QTableWidgetItem(format_currency(item.price)))
-            self.table.setItem(row, 5, QTableWidgetItem(str(item.stock)))
+        self.model.set_rows([self.item_row(item) for item in items])
+    
+    def show_search_error(self, message):
+        # Old results no longer match the search text, do not leave them up
+        self.model.set_rows([])
+        QMessageBox.warning(self, "Search Failed", f"Could not search: {message}")
+    
+    def item_row(self, item):
+        return (item.id, item.sku, item.name, item.brand, item.category, item.price, item.stock)
     
     def search_items(self):
         search_term = self.search_input.text()
         category_filter = self.category_filter.currentText()
         if category_filter == "All Categories":
             category_filter = None
-        items = self.inventory_service.search_items(search_term, category_filter)
-        self.populate_table(items)
+        self.search_controller.request(
+            lambda: self.inventory_service.search_items(search_term, category_filter)
+        )
     
     def add_item(self):
         dialog = InventoryItemDialog(self)
         if dialog.exec():
-            name, brand, category, price, stock = dialog.get_data()
-            if self.inventory_service.add_item(name, brand, category, price, stock):
+            name, brand, category, price, stock, sku = dialog.get_data()
+            try:
+                added = self.inventory_service.add_item(name, brand, category, price, stock, sku)
+            except sqlite3.IntegrityError:
+                QMessageBox.warning(self, "Warning", f"SKU '{sku}' is already used by another item.")
+                return
+            if added:
                 QMessageBox.information(self, "Success", "Item added successfully!")
-                self.refresh_data()
                 self.data_updated.emit()
     
     def edit_item(self):
-        selected_row = self.table.currentRow()
+        selected_row = current_row(self.table)
         if selected_row == -1:
             QMessageBox.warning(self, "Warning", "Please select an item to edit.")
             return
-        item_id = int(self.table.item(selected_row, 0).text())
+        item_id = self.model.row_id(selected_row)
         item = self.inventory_service.get_item_by_id(item_id)
         dialog = InventoryItemDialog(self, item)
         if dialog.exec():
-            name, brand, category, price, stock = dialog.get_data()
-            if self.inventory_service.update_item(item_id, name, brand, category, price, stock):
+            name, brand, category, price, stock, sku = dialog.get_data()
+            try:
+                updated = self.inventory_service.update_item(item_id, name, brand, category, price, stock, sku)
+            except sqlite3.IntegrityError:
+                QMessageBox.warning(self, "Warning", f"SKU '{sku}' is already used by another item.")
+                return
+            if updated:
                 QMessageBox.information(self, "Success", "Item updated successfully!")
-                self.refresh_data()
                 self.data_updated.emit()
     
     def delete_item(self):
-        selected_row = self.table.currentRow()
+        selected_row = current_row(self.table)
         if selected_row == -1:
             QMessageBox.warning(self, "Warning", "Please select an item to delete.")
             return
-        item_id = int(self.table.item(selected_row, 0).text())
-        item_name = self.table.item(selected_row, 1).text()
+        row = self.model.row(selected_row)
+        item_id, item_name = row[0], row[2]
         reply = QMessageBox.question(self, "Confirm Delete", f"Delete '{item_name}'?")
         if reply == QMessageBox.StandardButton.Yes:
             if self.inventory_service.delete_item(item_id):
                 QMessageBox.information(self, "Success", "Item deleted successfully!")
-                self.refresh_data()
                 self.data_updated.emit()
+    
+    def import_csv(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import Price List", "", "CSV Files (*.csv)")
+        if not path:
+            return
+        
+        progress = QProgressDialog("Importing...", None, 0, 0, self)
+        progress.setWindowTitle("Import")
+        progress.show()
+        
+        def report(done):
+            progress.setLabelText(f"Imported {done:,} rows...")
+            QApplication.processEvents()
+        
+        try:
+            result = CatalogImporter(self.db, progress=report).import_inventory(path)
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            QMessageBox.critical(self, "Import Failed", str(e))
+            return
+        except sqlite3.Error as e:
+            # Chunks are committed one at a time, the ones before the error stay
+            QMessageBox.critical(self, "Import Failed",
+                                 f"Database error: {e}\n\nRows imported before the error were kept.")
+            self.data_updated.emit()
+            return
+        finally:
+            progress.close()
+        
+        message = (f"{result.inserted:,} added, {result.updated:,} updated, "
+                   f"{len(result.rejected):,} rejected.")
+        if result.rejected:
+            message += "\n\n" + "\n".join(
+                f"Line {rejected.line_number}: {rejected.reason}" for rejected in result.rejected[:10]
+            )
+        QMessageBox.information(self, "Import Complete", message)
+        self.data_updated.emit()
 
 class InventoryItemDialog(QDialog):
     def __init__(self, parent=None, item=None):
@@ -135,6 +227,8 @@ class InventoryItemDialog(QDialog):
         self.setWindowTitle("Add Item" if not self.item else "Edit Item")
         layout = QFormLayout()
         
+        self.sku_input = QLineEdit()
+        self.sku_input.setPlaceholderText("Barcode or SKU (optional)")
         self.name_input = QLineEdit()
         self.brand_input = QLineEdit()
         self.category_input = QLineEdit()
@@ -147,9 +241,11 @@ class InventoryItemDialog(QDialog):
             self.name_input.setText(self.item.name)
             self.brand_input.setText(self.item.brand)
             self.category_input.setText(self.item.category)
-            self.price_input.setText(str(self.item.price))
+            self.price_input.setText(format_amount(self.item.price))
             self.stock_input.setValue(self.item.stock)
+            self.sku_input.setText(self.item.sku or "")
         
+        layout.addRow("SKU:", self.sku_input)
         layout.addRow("Name:", self.name_input)
         layout.addRow("Brand:", self.brand_input)
         layout.addRow("Category:", self.category_input)
@@ -167,8 +263,9 @@ class InventoryItemDialog(QDialog):
             self.name_input.text().strip(),
             self.brand_input.text().strip(),
             self.category_input.text().strip(),
-            float(self.price_input.text()),
-            self.stock_input.value()
+            to_cents(self.price_input.text()),
+            self.stock_input.value(),
+            self.sku_input.text().strip()
         )
     
     def validate_and_accept(self):
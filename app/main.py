@@ -1,6 +1,8 @@
 import sys
 import os
+import sqlite3
 from PyQt6.QtWidgets import QApplication, QMainWindow, QTabWidget, QVBoxLayout, QWidget
+from PyQt6.QtCore import QTimer
 from core.db import DatabaseManager
 from inventory.view import InventoryTab
 from services.view import ServicesTab
@@ -35,19 +37,25 @@ class MainWindow(QMainWindow):
         
         layout.addWidget(self.tabs)
         
-        self.inventory_tab.data_updated.connect(self.refresh_all)
-        self.services_tab.data_updated.connect(self.refresh_all)
-        self.sales_tab.data_updated.connect(self.refresh_all)
+        # Tabs keep themselves current from the ChangeEvents on self.db.events,
+        # polling adds events for commits made by other terminals
+        self.db.poll_external_changes()
+        self.change_timer = QTimer(self)
+        self.change_timer.timeout.connect(self.poll_external_changes)
+        self.change_timer.start(2000)
     
-    def refresh_all(self):
-        self.dashboard_tab.refresh_data()
-        self.inventory_tab.refresh_data()
-        self.services_tab.refresh_data()
-        self.sales_tab.refresh_data()
+    def poll_external_changes(self):
+        try:
+            self.db.poll_external_changes()
+        except sqlite3.Error as e:
+            # Shared file briefly unreachable, the next tick tries again
+            print(f"Change polling failed: {e}", file=sys.stderr)
 
 def main():
     app = QApplication(sys.argv)
     window = MainWindow()
+    # Connected after the tabs so their quit handlers still have the database
+    app.aboutToQuit.connect(window.db.close)
     window.show()
     sys.exit(app.exec())
 
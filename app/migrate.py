@@ -0,0 +1,22 @@
+import sys
+from core.db import DatabaseManager
+from core.migrations import get_schema_version, explain_hot_queries
+
+def migrate(explain=False, rebuild_summary=False):
+    # Opening the database applies any pending migrations
+    db = DatabaseManager()
+    print(f"✅ Database at schema version {get_schema_version(db.get_connection())}")
+    
+    if rebuild_summary:
+        days = db.rebuild_daily_sales_summary()
+        print(f"✅ Rebuilt daily sales summary for {days} day(s)")
+    
+    if explain:
+        for name, plan in explain_hot_queries(db):
+            print(f"\n{name}:")
+            for line in plan:
+                print(f"  {line}")
+
+if __name__ == "__main__":
+    migrate(explain="--explain" in sys.argv, rebuild_summary="--rebuild-summary" in sys.argv)
+    input("Press Enter to exit...")
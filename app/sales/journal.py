@@ -0,0 +1,190 @@
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+
+from core.utils import get_current_date, default_terminal_id
+
+def default_journal_path(db_path, terminal_id=None):
+    """data/journal-<terminal>.db next to the main database
+    
+    Keyed by the terminal id, not the process, so sales left unsynced by a
+    crash are picked up by the next run.
+    """
+    terminal_id = terminal_id or default_terminal_id()
+    return os.path.join(os.path.dirname(db_path), f"journal-{terminal_id}.db")
+
+class SaleJournal:
+    """Append-only local log of checkouts for one terminal.
+    
+    Appending is a small write to a file only this terminal uses, so it never
+    waits on the shared database. SyncWorker replays the entries into it.
+    """
+    
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        # Shared by the GUI and sync threads, guarded by _lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # A journaled sale must survive power loss, the file is tiny
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS sale_journal (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                sale_uuid TEXT NOT NULL UNIQUE,
+                payload TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                synced_at TIMESTAMP,
+                failed_at TIMESTAMP,
+                error TEXT
+            )
+        ''')
+        # Journals written before entries could be set aside
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(sale_journal)")]
+        if 'failed_at' not in columns:
+            self._conn.execute("ALTER TABLE sale_journal ADD COLUMN failed_at TIMESTAMP")
+            self._conn.execute("ALTER TABLE sale_journal ADD COLUMN error TEXT")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sale_journal_pending ON sale_journal(seq) WHERE synced_at IS NULL"
+        )
+        self._conn.commit()
+    
+    def append(self, items, total_amount, customer_name=""):
+        """Journal one checkout, returns its sale UUID"""
+        sale_uuid = uuid.uuid4().hex
+        payload = json.dumps({
+            'sale_date': get_current_date(),
+            # Same UTC format as CURRENT_TIMESTAMP in sales.created_at
+            'sold_at': datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+            'total_amount': total_amount,
+            'customer_name': customer_name,
+            'items': [item.to_dict() for item in items],
+        })
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sale_journal (sale_uuid, payload) VALUES (?, ?)", (sale_uuid, payload)
+            )
+            self._conn.commit()
+        return sale_uuid
+    
+    def pending(self, limit=100):
+        """Oldest unsynced entries as (sale_uuid, payload dict), set-aside ones excluded
+        
+        limit=None returns all of them.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT sale_uuid, payload FROM sale_journal WHERE synced_at IS NULL AND failed_at IS NULL "
+                "ORDER BY seq LIMIT ?",
+                (-1 if limit is None else limit,)
+            ).fetchall()
+        return [(sale_uuid, json.loads(payload)) for sale_uuid, payload in rows]
+    
+    def pending_count(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM sale_journal WHERE synced_at IS NULL AND failed_at IS NULL"
+            ).fetchone()[0]
+    
+    def failed_count(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM sale_journal WHERE synced_at IS NULL AND failed_at IS NOT NULL"
+            ).fetchone()[0]
+    
+    def set_aside(self, failures):
+        """Stop replaying entries that failed, failures is (sale_uuid, error) pairs
+        
+        They stay in the journal with their error for someone to look at.
+        """
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE sale_journal SET failed_at = CURRENT_TIMESTAMP, error = ? WHERE sale_uuid = ?",
+                [(error, sale_uuid) for sale_uuid, error in failures]
+            )
+            self._conn.commit()
+    
+    def mark_synced(self, sale_uuids):
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE sale_journal SET synced_at = CURRENT_TIMESTAMP WHERE sale_uuid = ?",
+                [(sale_uuid,) for sale_uuid in sale_uuids]
+            )
+            self._conn.commit()
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class SyncWorker:
+    """Background thread replaying journaled sales into the main database.
+    
+    Pending entries go through the database's write queue, so a batch is
+    written in as few commits as the queue can group them. Replay is
+    idempotent on sale_uuid, so an entry whose mark_synced was lost (crash
+    between the two writes) is skipped rather than sold twice. While the
+    database is locked or unreachable the worker retries every interval; an
+    entry that fails by itself is set aside so the ones after it still sync.
+    """
+    
+    def __init__(self, journal, sales_service, interval=5.0, batch_size=100):
+        self.journal = journal
+        self.sales_service = sales_service
+        self.interval = interval
+        self.batch_size = batch_size
+        self.last_error = None
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sale-sync", daemon=True)
+        self._thread.start()
+    
+    def wake(self):
+        """Sync now instead of at the next interval"""
+        self._wake.set()
+    
+    def stop(self):
+        """Finish the current round and stop"""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def sync_once(self):
+        """Replay pending entries until none are left, returns how many were written"""
+        written = 0
+        error = None
+        while True:
+            entries = self.journal.pending(self.batch_size)
+            if not entries:
+                self.last_error = error
+                return written
+            try:
+                replayed, failed = self.sales_service.replay_sales(entries)
+            except sqlite3.OperationalError as e:
+                # Locked or unreachable, keep the batch for the next round
+                self.last_error = str(e)
+                return written
+            self.journal.mark_synced([sale_uuid for sale_uuid, _, _ in replayed])
+            written += sum(created for _, _, created in replayed)
+            if failed:
+                self.journal.set_aside(failed)
+                error = f"{len(failed)} sale(s) set aside: {failed[-1][1]}"
+    
+    def _run(self):
+        while not self._stopping:
+            # Cleared first so a wake() during the round is not lost
+            self._wake.clear()
+            try:
+                self.sync_once()
+            except Exception as e:
+                self.last_error = str(e)
+            self._wake.wait(self.interval)
+        self.sales_service.db.release_connection()
\ No newline at end of file
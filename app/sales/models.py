@@ -1,22 +1,27 @@
 import json
 
 class Sale:
-    def __init__(self, id, sale_date, total_amount, items):
+    __slots__ = ('id', 'sale_date', 'total_amount', 'items', 'customer_name')
+    
+    def __init__(self, id, sale_date, total_amount, items, customer_name=""):
         self.id = id
         self.sale_date = sale_date
-        self.total_amount = total_amount
+        self.total_amount = total_amount  # Integer centavos
         self.items = items
+        self.customer_name = customer_name
     
     @classmethod
     def from_db_row(cls, row):
-        return cls(row[0], row[1], row[2], row[3])
+        return cls(row[0], row[1], row[2], row[3], row[4] if len(row) > 4 else "")
 
 class CartItem:
+    __slots__ = ('id', 'name', 'type', 'price', 'quantity')
+    
     def __init__(self, id, name, type, price, quantity=1):
         self.id = id
         self.name = name
         self.type = type  # 'item' or 'service'
-        self.price = price
+        self.price = price  # Integer centavos
         self.quantity = quantity
     
     @property
@@ -31,4 +36,51 @@ class CartItem:
             'price': self.price,
             'quantity': self.quantity,
             'total': self.total
-        }
\ No newline at end of file
+        }
+
+class Cart:
+    """Cart lines keyed by (type, id) with a running total.
+    
+    Adding a product that is already in the cart merges into its line, so
+    lookups, merges and the total are all O(1) however long the ticket is.
+    """
+    
+    def __init__(self):
+        # (type, id) -> CartItem, insertion order is display order
+        self._lines = {}
+        self.total = 0  # Integer centavos, exact however many lines
+    
+    def __len__(self):
+        return len(self._lines)
+    
+    def __bool__(self):
+        return bool(self._lines)
+    
+    def __iter__(self):
+        return iter(self._lines.values())
+    
+    def get(self, item_type, item_id):
+        return self._lines.get((item_type, item_id))
+    
+    def quantity_of(self, item_type, item_id):
+        line = self._lines.get((item_type, item_id))
+        return line.quantity if line else 0
+    
+    def item_quantities(self):
+        """item_id -> quantity of the inventory lines, what the cart holds"""
+        return {line.id: line.quantity for line in self._lines.values() if line.type == 'item'}
+    
+    def add(self, item_id, name, item_type, price, quantity=1):
+        """Add quantity of a product, returns the (possibly merged) line"""
+        line = self._lines.get((item_type, item_id))
+        if line is None:
+            line = CartItem(item_id, name, item_type, price, quantity)
+            self._lines[(item_type, item_id)] = line
+        else:
+            line.quantity += quantity
+        self.total += line.price * quantity
+        return line
+    
+    def clear(self):
+        self._lines.clear()
+        self.total = 0
\ No newline at end of file
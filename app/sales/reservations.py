@@ -0,0 +1,67 @@
+import time
+
+from .service import InsufficientStockError, RESERVED_BY_OTHERS, release_holds
+
+class ReservationService:
+    """Per-terminal stock holds for items sitting in a cart.
+    
+    A hold is written when a line is added to the cart, so other terminals
+    sharing the database see the stock as taken. record_sale converts the
+    holds into the sale, SalesService.hold_for_sale moves them onto a
+    journaled sale until it is replayed, and clear/quit releases them.
+    Holds expire after ttl_seconds so a crashed terminal cannot lock stock
+    forever; every reserve() renews all of the terminal's holds.
+    """
+    
+    def __init__(self, db, terminal_id, ttl_seconds=900):
+        self.db = db
+        self.terminal_id = terminal_id
+        self.ttl_seconds = ttl_seconds
+    
+    def reserve(self, item_id, quantity):
+        """Hold quantity more of an item, returns the stock still available
+        
+        Raises InsufficientStockError when stock minus everyone else's holds
+        cannot cover this terminal's new total.
+        """
+        now = time.time()
+        
+        # Short write transaction: check and hold atomically, then let go
+        with self.db.transaction(immediate=True) as cursor:
+            cursor.execute("DELETE FROM stock_reservations WHERE expires_at <= ?", (now,))
+            cursor.execute(
+                f"SELECT stock - ({RESERVED_BY_OTHERS}) FROM inventory WHERE id = ?",
+                (self.terminal_id, now, item_id)
+            )
+            row = cursor.fetchone()
+            available = row[0] if row else 0
+            cursor.execute(
+                "SELECT quantity FROM stock_reservations WHERE terminal_id = ? AND item_id = ?",
+                (self.terminal_id, item_id)
+            )
+            row = cursor.fetchone()
+            held = row[0] if row else 0
+            
+            if held + quantity > available:
+                raise InsufficientStockError([(item_id, held + quantity, available)])
+            
+            cursor.execute('''
+                INSERT INTO stock_reservations (terminal_id, item_id, quantity, expires_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(terminal_id, item_id) DO UPDATE SET quantity = excluded.quantity
+            ''', (self.terminal_id, item_id, held + quantity, now + self.ttl_seconds))
+            # Activity on the cart keeps every line in it held
+            cursor.execute(
+                "UPDATE stock_reservations SET expires_at = ? WHERE terminal_id = ?",
+                (now + self.ttl_seconds, self.terminal_id)
+            )
+        return available - held - quantity
+    
+    def release(self, quantities):
+        """Give back a cart's holds, quantities is item_id -> held
+        
+        Only the cart's own quantities are taken off: a sale checked out just
+        before may still be waiting in the write queue to move its holds.
+        """
+        with self.db.transaction() as cursor:
+            release_holds(cursor, self.terminal_id, quantities)
\ No newline at end of file
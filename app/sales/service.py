@@ -1,53 +1,334 @@
 from core.db import DatabaseManager
-from core.utils import serialize_items, get_current_date
-from .models import Sale
+from core.utils import serialize_items, get_current_date, to_cents
+from core.events import ChangeEvent, INSERT, UPDATE
+from inventory.replenishment import ReplenishmentService
+from .models import Sale, CartItem
 import sqlite3
+import time
+import uuid
+
+class SaleError(Exception):
+    """Raised when a sale cannot be recorded"""
+
+class InsufficientStockError(SaleError):
+    """Raised when one or more cart lines would oversell an item"""
+    
+    def __init__(self, shortages):
+        # List of (item_id, requested, available)
+        self.shortages = shortages
+        details = ", ".join(
+            f"item #{item_id}: requested {requested}, available {available}"
+            for item_id, requested, available in shortages
+        )
+        super().__init__(f"Not enough stock ({details})")
+
+# Stock of the current inventory row held by other terminals' live
+# reservations and by journaled sales not replayed yet (this terminal's too,
+# they left its cart), binds terminal_id and now
+RESERVED_BY_OTHERS = """
+    SELECT (
+        SELECT COALESCE(SUM(quantity), 0) FROM stock_reservations
+        WHERE item_id = inventory.id AND terminal_id IS NOT ? AND expires_at > ?
+    ) + (SELECT COALESCE(SUM(quantity), 0) FROM sale_holds WHERE item_id = inventory.id)
+"""
+
+def release_holds(cursor, terminal_id, quantities):
+    """Take quantities (item_id -> amount) off a terminal's holds, dropping emptied rows"""
+    cursor.executemany(
+        "UPDATE stock_reservations SET quantity = quantity - ? WHERE terminal_id = ? AND item_id = ?",
+        [(quantity, terminal_id, item_id) for item_id, quantity in quantities.items()]
+    )
+    cursor.execute("DELETE FROM stock_reservations WHERE terminal_id = ? AND quantity <= 0", (terminal_id,))
+
+def _journal_cents(amount):
+    """Money from a journal entry, floats are pesos written before centavos"""
+    return to_cents(amount) if isinstance(amount, float) else amount
+
+def _journal_lines(items):
+    """CartItems from a journal entry's item dicts"""
+    return [
+        CartItem(item['id'], item['name'], item['type'], _journal_cents(item['price']), item['quantity'])
+        for item in items
+    ]
 
 class SalesService:
-    def __init__(self, db):
+    def __init__(self, db, terminal_id=None):
         self.db = db
+        # Reservations made under this id are converted by record_sale,
+        # None means every live reservation belongs to someone else
+        self.terminal_id = terminal_id
+        self.replenishment = ReplenishmentService(db)
     
     def record_sale(self, items, total_amount, customer_name=""):
-        """Record a new sale with customer name"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
+        """Record a new sale with customer name, raises SaleError on failure"""
+        quantities = self._quantities_by_item(items)
         try:
-            # Begin transaction
-            cursor.execute("BEGIN TRANSACTION")
-            
-            # Serialize items
-            items_json = serialize_items([item.to_dict() for item in items])
-            
-            # Insert sale record
+            # Take the write lock up front so concurrent terminals queue on
+            # busy_timeout instead of failing on a read-to-write upgrade
+            with self.db.transaction(immediate=True) as cursor:
+                sale_id = self._write_sale(cursor, items, total_amount, customer_name, quantities,
+                                           uuid.uuid4().hex)
+        except SaleError:
+            raise
+        except Exception as e:
+            raise SaleError(f"Error recording sale: {e}") from e
+        
+        self._publish_sale(sale_id, quantities)
+        return True
+    
+    def submit_sale(self, items, total_amount, customer_name=""):
+        """Queue a sale for the next group commit, returns a Future of the sale id
+        
+        The Future raises SaleError (or InsufficientStockError) like
+        record_sale. Suited to callers writing many sales concurrently.
+        """
+        # The caller may clear its cart before the writer gets to it
+        items = list(items)
+        quantities = self._quantities_by_item(items)
+        
+        sale_uuid = uuid.uuid4().hex
+        
+        def write(cursor):
+            try:
+                return self._write_sale(cursor, items, total_amount, customer_name, quantities, sale_uuid)
+            except SaleError:
+                raise
+            except Exception as e:
+                raise SaleError(f"Error recording sale: {e}") from e
+        
+        return self.db.write_queue().submit(
+            write, after_commit=lambda sale_id: self._publish_sale(sale_id, quantities)
+        )
+    
+    def hold_for_sale(self, sale_uuid, items):
+        """Queue moving a journaled sale's stock from the cart holds onto the sale
+        
+        The sale keeps its stock taken until its replay, without expiring and
+        without counting as this terminal's cart. Returns the write queue's
+        Future; checkout does not wait on the shared database for it.
+        """
+        quantities = self._quantities_by_item(items)
+        return self.db.write_queue().submit(lambda cursor: self._hold_sale_stock(cursor, sale_uuid, quantities))
+    
+    def reclaim_holds(self, entries):
+        """Move pending journal entries' stock onto their sales, drop the terminal's other holds
+        
+        For startup, entries are the journal's pending (sale_uuid, payload)
+        pairs. The previous run may have stopped before moving their holds;
+        anything else this terminal still holds was in an abandoned cart.
+        """
+        with self.db.transaction(immediate=True) as cursor:
+            for sale_uuid, sale in entries:
+                try:
+                    quantities = self._quantities_by_item(_journal_lines(sale['items']))
+                except (KeyError, TypeError):
+                    # Malformed, replay sets it aside
+                    continue
+                self._hold_sale_stock(cursor, sale_uuid, quantities)
+            cursor.execute("DELETE FROM stock_reservations WHERE terminal_id = ?", (self.terminal_id,))
+    
+    def replay_sales(self, entries):
+        """Replay journal entries, (sale_uuid, payload) pairs, through the write queue
+        
+        The entries share group commits with any other queued writes. Each
+        one gets a savepoint: one that fails is rolled back and returned with
+        its error, the rest still commit. OperationalError (locked,
+        unreachable) is raised once every entry has been tried, the ones
+        already committed are skipped by the next replay. Returns (replayed,
+        failed) as lists of (sale_uuid, sale_id, created) and (sale_uuid, error).
+        """
+        futures = [(sale_uuid, self._submit_replay(sale_uuid, sale)) for sale_uuid, sale in entries]
+        replayed = []
+        failed = []
+        unreachable = None
+        for sale_uuid, future in futures:
+            try:
+                sale_id, quantities = future.result()
+            except sqlite3.OperationalError as e:
+                unreachable = e
+                continue
+            except Exception as e:
+                failed.append((sale_uuid, f"{type(e).__name__}: {e}"))
+                continue
+            replayed.append((sale_uuid, sale_id, quantities is not None))
+        if unreachable is not None:
+            raise unreachable
+        return replayed, failed
+    
+    def _submit_replay(self, sale_uuid, sale):
+        """Queue one journal entry, returns a Future of (sale_id, quantities)"""
+        def write(cursor):
+            return self._replay(cursor, sale_uuid, sale['sale_date'], sale['items'],
+                                sale['total_amount'], sale['customer_name'], sale.get('sold_at'))
+        
+        def publish(result):
+            sale_id, quantities = result
+            if quantities is not None:
+                self._publish_sale(sale_id, quantities)
+        
+        return self.db.write_queue().submit(write, after_commit=publish)
+    
+    def _replay(self, cursor, sale_uuid, sale_date, items, total_amount, customer_name, sold_at):
+        """Write one journaled sale, returns (sale_id, quantities), quantities None if already recorded
+        
+        items are CartItem dicts and sold_at the UTC checkout time, kept as
+        created_at so hour-of-day reports ignore sync delays. The sale
+        already happened at the counter, so stock is decremented without the
+        availability check; lines selling more than the stock on record go
+        to stock_shortages.
+        """
+        cursor.execute("SELECT id FROM sales WHERE sale_uuid = ?", (sale_uuid,))
+        row = cursor.fetchone()
+        if row:
+            return row[0], None
+        lines = _journal_lines(items)
+        quantities = self._quantities_by_item(lines)
+        # No-op when hold_for_sale got there first, otherwise the cart's holds
+        # still carry the sale
+        self._hold_sale_stock(cursor, sale_uuid, quantities)
+        sale_id = self._write_sale(cursor, lines, _journal_cents(total_amount), customer_name, quantities,
+                                   sale_uuid, sale_date, replayed=True, created_at=sold_at)
+        return sale_id, quantities
+    
+    def _hold_sale_stock(self, cursor, sale_uuid, quantities):
+        """Move a journaled sale's quantities into sale_holds, at most once per item"""
+        moved = {}
+        for item_id, quantity in quantities.items():
+            # Never after the replay, a hold written then would not be dropped
             cursor.execute(
-                "INSERT INTO sales (sale_date, total_amount, items, customer_name) VALUES (?, ?, ?, ?)",
-                (get_current_date(), total_amount, items_json, customer_name)
+                "INSERT OR IGNORE INTO sale_holds (sale_uuid, item_id, quantity) "
+                "SELECT ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM sales WHERE sale_uuid = ?)",
+                (sale_uuid, item_id, quantity, sale_uuid)
             )
-            
-            # Update inventory stock
-            for item in items:
-                if item.type == 'item':
-                    self._update_inventory_stock(cursor, item.id, item.quantity)
-            
-            conn.commit()
-            return True
-            
-        except Exception as e:
-            conn.rollback()
-            print(f"Error recording sale: {e}")
-            return False
+            if cursor.rowcount:
+                moved[item_id] = quantity
+        if moved and self.terminal_id is not None:
+            release_holds(cursor, self.terminal_id, moved)
     
-    def _update_inventory_stock(self, cursor, item_id, quantity_sold):
-        """Update inventory stock using existing cursor"""
-        cursor.execute("SELECT stock FROM inventory WHERE id = ?", (item_id,))
-        result = cursor.fetchone()
-        if result:
-            current_stock = result[0]
-            new_stock = current_stock - quantity_sold
-            if new_stock < 0:
-                new_stock = 0
-            cursor.execute("UPDATE inventory SET stock = ? WHERE id = ?", (new_stock, item_id))
+    def _write_sale(self, cursor, items, total_amount, customer_name, quantities,
+                    sale_uuid, sale_date=None, replayed=False, created_at=None):
+        """Write one sale inside the caller's transaction, returns its id"""
+        # Serialize items
+        items_json = serialize_items([item.to_dict() for item in items])
+        sale_date = sale_date or get_current_date()
+        
+        # Insert sale record, created_at defaults to now (UTC)
+        cursor.execute(
+            "INSERT INTO sales (sale_date, total_amount, items, customer_name, sale_uuid, created_at) "
+            "VALUES (?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))",
+            (sale_date, total_amount, items_json, customer_name, sale_uuid, created_at)
+        )
+        sale_id = cursor.lastrowid
+        
+        # Insert line items
+        self._insert_sale_items(cursor, sale_id, items)
+        
+        # Roll the sale into today's summary
+        self._update_daily_summary(cursor, sale_date, total_amount, items)
+        
+        # Update inventory stock - all lines or nothing
+        now = time.time()
+        if replayed:
+            self._replay_inventory_stock(cursor, sale_id, sale_uuid, quantities)
+        elif not self._update_inventory_stock(cursor, quantities, now):
+            raise InsufficientStockError(self._find_shortages(cursor, quantities, now))
+        
+        # Sales velocity and reorder points of the sold items
+        self.replenishment.record_sale(cursor, sale_date, quantities)
+        
+        # This terminal's holds on the sold items became the sale
+        if quantities and self.terminal_id is not None and not replayed:
+            cursor.executemany(
+                "DELETE FROM stock_reservations WHERE terminal_id = ? AND item_id = ?",
+                [(self.terminal_id, item_id) for item_id in quantities]
+            )
+        return sale_id
+    
+    def _publish_sale(self, sale_id, quantities):
+        self.db.events.publish(ChangeEvent('sales', INSERT, [sale_id]))
+        if quantities:
+            self.db.events.publish(ChangeEvent('inventory', UPDATE, quantities, ['stock']))
+    
+    def _insert_sale_items(self, cursor, sale_id, items):
+        """Insert one sale_items row per cart line using existing cursor"""
+        cursor.executemany(
+            "INSERT INTO sale_items (sale_id, item_type, item_id, name, quantity, unit_price, line_total) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(sale_id, item.type, item.id, item.name, item.quantity, item.price, item.total) for item in items]
+        )
+    
+    def _update_daily_summary(self, cursor, sale_date, total_amount, items):
+        """Add one sale to daily_sales_summary using existing cursor"""
+        items_sold = sum(item.quantity for item in items if item.type == 'item')
+        service_revenue = sum(item.total for item in items if item.type == 'service')
+        cursor.execute('''
+            INSERT INTO daily_sales_summary (sale_date, revenue, ticket_count, items_sold, service_revenue)
+            VALUES (?, ?, 1, ?, ?)
+            ON CONFLICT(sale_date) DO UPDATE SET
+                revenue = revenue + excluded.revenue,
+                ticket_count = ticket_count + 1,
+                items_sold = items_sold + excluded.items_sold,
+                service_revenue = service_revenue + excluded.service_revenue
+        ''', (sale_date, total_amount, items_sold, service_revenue))
+    
+    def _quantities_by_item(self, items):
+        """Total quantity per inventory item, repeated cart lines combined"""
+        quantities = {}
+        for item in items:
+            if item.type == 'item':
+                quantities[item.id] = quantities.get(item.id, 0) + item.quantity
+        return quantities
+    
+    def _update_inventory_stock(self, cursor, quantities, now):
+        """Decrement stock in one batch, returns False if any line would oversell
+        
+        Stock held by other terminals' live reservations is not available.
+        """
+        params = [
+            (quantity, item_id, self.terminal_id, now, quantity)
+            for item_id, quantity in quantities.items()
+        ]
+        cursor.executemany(
+            f"UPDATE inventory SET stock = stock - ? WHERE id = ? AND stock - ({RESERVED_BY_OTHERS}) >= ?",
+            params
+        )
+        # rowcount is the total number of rows changed by the whole batch
+        return cursor.rowcount == len(params)
+    
+    def _replay_inventory_stock(self, cursor, sale_id, sale_uuid, quantities):
+        """Decrement stock for a journaled sale and drop its holds"""
+        cursor.execute("DELETE FROM sale_holds WHERE sale_uuid = ?", (sale_uuid,))
+        if not quantities:
+            return
+        
+        placeholders = ",".join("?" * len(quantities))
+        cursor.execute(f"SELECT id, stock FROM inventory WHERE id IN ({placeholders})", list(quantities))
+        stock = dict(cursor.fetchall())
+        # The goods already left, so stock may go negative until it is
+        # recounted; the shortage is kept for that instead of being clamped
+        cursor.executemany(
+            "INSERT INTO stock_shortages (sale_id, item_id, requested, available) VALUES (?, ?, ?, ?)",
+            [(sale_id, item_id, quantity, stock[item_id])
+             for item_id, quantity in quantities.items() if item_id in stock and stock[item_id] < quantity]
+        )
+        cursor.executemany(
+            "UPDATE inventory SET stock = stock - ? WHERE id = ?",
+            [(quantity, item_id) for item_id, quantity in quantities.items()]
+        )
+    
+    def _find_shortages(self, cursor, quantities, now):
+        """List (item_id, requested, available) for lines that cannot be filled"""
+        placeholders = ",".join("?" * len(quantities))
+        cursor.execute(
+            f"SELECT id, stock - ({RESERVED_BY_OTHERS}) FROM inventory WHERE id IN ({placeholders})",
+            [self.terminal_id, now, *quantities]
+        )
+        stock = dict(cursor.fetchall())
+        return [
+            (item_id, quantity, stock.get(item_id, 0))
+            for item_id, quantity in quantities.items()
+            if stock.get(item_id, 0) < quantity
+        ]
     
     def get_today_sales(self):
         """Get sales for today"""
@@ -58,12 +339,12 @@ class SalesService:
         return sales
     
     def get_total_sales_today(self):
-        """Get total sales amount for today"""
+        """Get total sales amount for today in centavos"""
         conn = self.db.get_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT SUM(total_amount) FROM sales WHERE sale_date = ?", (get_current_date(),))
-        result = cursor.fetchone()[0]
-        return result if result else 0.0
+        cursor.execute("SELECT revenue FROM daily_sales_summary WHERE sale_date = ?", (get_current_date(),))
+        result = cursor.fetchone()
+        return result[0] if result else 0
     
     def get_all_sales(self):
         """Get all sales"""
@@ -71,4 +352,47 @@ class SalesService:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM sales ORDER BY sale_date DESC, id DESC")
         sales = [Sale.from_db_row(row) for row in cursor.fetchall()]
-        return sales
\ No newline at end of file
+        return sales
+    
+    def get_sales_page(self, limit=100, after=None, start_date=None, end_date=None, customer_name=None):
+        """Get one page of sales, newest first.
+        
+        after is the (sale_date, id) cursor returned with the previous page.
+        Returns (sales, next_cursor), next_cursor is None on the last page.
+        """
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        
+        query = "SELECT id, sale_date, total_amount, items, customer_name FROM sales WHERE 1 = 1"
+        params = []
+        
+        if after:
+            # Row value comparison walks the sale_date index from the cursor onwards
+            query += " AND (sale_date, id) < (?, ?)"
+            params.extend(after)
+        if start_date:
+            query += " AND sale_date >= ?"
+            params.append(start_date)
+        if end_date:
+            query += " AND sale_date <= ?"
+            params.append(end_date)
+        if customer_name:
+            query += " AND customer_name LIKE ?"
+            params.append(f'%{customer_name}%')
+        
+        query += " ORDER BY sale_date DESC, id DESC LIMIT ?"
+        params.append(limit)
+        cursor.execute(query, params)
+        sales = [Sale.from_db_row(row) for row in cursor.fetchall()]
+        
+        next_cursor = (sales[-1].sale_date, sales[-1].id) if len(sales) == limit else None
+        return sales, next_cursor
+    
+    def iter_sales(self, page_size=500, start_date=None, end_date=None, customer_name=None):
+        """Yield sales newest first, fetching one page at a time"""
+        after = None
+        while True:
+            sales, after = self.get_sales_page(page_size, after, start_date, end_date, customer_name)
+            yield from sales
+            if after is None:
+                break
\ No newline at end of file
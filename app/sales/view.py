@@ -1,14 +1,22 @@
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, 
-                            QTableWidgetItem, QPushButton, QLineEdit, QComboBox,
+import sqlite3
+import sys
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit, QComboBox,
                             QLabel, QMessageBox, QDialog, QFormLayout, QDialogButtonBox,
-                            QSpinBox, QHeaderView, QSplitter, QTextEdit)
-from PyQt6.QtCore import Qt, pyqtSignal
+                            QSpinBox, QHeaderView, QSplitter, QTextEdit, QApplication)
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 
-from .service import SalesService
-from .models import CartItem
+from .service import SalesService, InsufficientStockError
+from .reservations import ReservationService
+from .journal import SaleJournal, SyncWorker, default_journal_path
+from .models import Cart
 from inventory.service import InventoryService
 from services.service import ServicesService
-from core.utils import format_currency
+from core.utils import format_currency, default_terminal_id
+from core.table_model import RowTableModel, create_table_view, current_row
+from core.search import SearchController
+from core.qt_events import ChangeRelay
+from core.events import INSERT, DELETE
+from core.pool import PoolTimeout
 
 class SalesTab(QWidget):
     data_updated = pyqtSignal()
@@ -16,12 +24,39 @@ class SalesTab(QWidget):
     def __init__(self, db):
         super().__init__()
         self.db = db
-        self.sales_service = SalesService(db)
+        terminal_id = default_terminal_id()
+        self.sales_service = SalesService(db, terminal_id)
+        # Cart lines hold their stock so other terminals cannot sell it too
+        self.reservations = ReservationService(db, terminal_id)
+        # Checkout only writes the local journal, the worker copies sales to the database
+        self.journal = SaleJournal(default_journal_path(db.db_path, terminal_id))
+        try:
+            # Leftovers of this terminal's previous run: unsynced sales keep
+            # their stock, the rest was an abandoned cart
+            self.sales_service.reclaim_holds(self.journal.pending(None))
+        except (sqlite3.Error, PoolTimeout) as e:
+            # The cart holds expire on their own after the reservation TTL
+            QMessageBox.warning(self, "Warning", f"Could not release stock held by the last session: {e}")
+        QApplication.instance().aboutToQuit.connect(self.release_on_quit)
+        self.sync_worker = SyncWorker(self.journal, self.sales_service)
+        self.sync_worker.start()
+        QApplication.instance().aboutToQuit.connect(self.stop_sync)
         self.inventory_service = InventoryService(db)
         self.services_service = ServicesService(db)
-        self.cart = []
+        self.search_controller = SearchController(db, parent=self)
+        self.search_controller.results_ready.connect(self.show_search_results)
+        self.search_controller.search_failed.connect(self.show_search_error)
+        self.changes = ChangeRelay(db.events, self)
+        self.changes.changed.connect(self.apply_change)
+        self.cart = Cart()
         self.init_ui()
         self.refresh_data()
+        
+        # Journal counts are local reads, cheap enough to poll
+        self.sync_timer = QTimer(self)
+        self.sync_timer.timeout.connect(self.update_sync_status)
+        self.sync_timer.start(2000)
+        self.update_sync_status()
     
     def init_ui(self):
         main_layout = QVBoxLayout()
@@ -34,9 +69,25 @@ class SalesTab(QWidget):
         self.customer_input.setMinimumWidth(300)
         customer_layout.addWidget(self.customer_input)
         customer_layout.addStretch()
+        self.sync_status = QLabel("")
+        customer_layout.addWidget(self.sync_status)
         
         main_layout.addLayout(customer_layout)
         
+        # Barcode/SKU scan - scanners type the code and press Enter
+        scan_layout = QHBoxLayout()
+        scan_layout.addWidget(QLabel("Scan:"))
+        self.scan_input = QLineEdit()
+        self.scan_input.setPlaceholderText("Scan barcode or type SKU and press Enter")
+        self.scan_input.setMinimumWidth(300)
+        self.scan_input.returnPressed.connect(self.scan_code)
+        scan_layout.addWidget(self.scan_input)
+        self.scan_status = QLabel("")
+        scan_layout.addWidget(self.scan_status)
+        scan_layout.addStretch()
+        
+        main_layout.addLayout(scan_layout)
+        
         # Main content splitter
         splitter = QSplitter(Qt.Orientation.Horizontal)
         
@@ -64,9 +115,9 @@ class SalesTab(QWidget):
         left_layout.addLayout(search_layout)
         
         # Available items table
-        self.available_table = QTableWidget()
-        self.available_table.setColumnCount(4)
-        self.available_table.setHorizontalHeaderLabels(["ID", "Name", "Type", "Price"])
+        self.available_model = RowTableModel(["ID", "Name", "Type", "Price"],
+                                             {2: str.title, 3: format_currency})
+        self.available_table = create_table_view(self.available_model, stretch=False)
         self.available_table.doubleClicked.connect(self.add_to_cart_from_table)
         left_layout.addWidget(self.available_table)
         
@@ -89,10 +140,11 @@ class SalesTab(QWidget):
         right_widget = QWidget()
         right_layout = QVBoxLayout(right_widget)
         
-        # Cart table
-        self.cart_table = QTableWidget()
-        self.cart_table.setColumnCount(6)
-        self.cart_table.setHorizontalHeaderLabels(["ID", "Name", "Type", "Price", "Qty", "Total"])
+        # Cart table - rows are keyed by (type, id) so a line can be updated alone
+        self.cart_model = RowTableModel(["ID", "Name", "Type", "Price", "Qty", "Total"],
+                                        {0: lambda key: str(key[1]), 2: str.title,
+                                         3: format_currency, 5: format_currency})
+        self.cart_table = create_table_view(self.cart_model, stretch=False)
         right_layout.addWidget(self.cart_table)
         
         # Total and buttons
@@ -126,6 +178,8 @@ class SalesTab(QWidget):
         self.update_cart_display()
     
     def refresh_available_items(self):
+        # A full reload replaces whatever search is still pending
+        self.search_controller.cancel()
         item_type = self.type_combo.currentText()
         if item_type == "Items":
             items = self.inventory_service.get_all_items()
@@ -134,80 +188,149 @@ class SalesTab(QWidget):
             services = self.services_service.get_all_services()
             self.populate_available_table(services, "service")
     
+    def apply_change(self, event):
+        """Update the available table for catalog changes of the shown type"""
+        shown = "inventory" if self.type_combo.currentText() == "Items" else "services"
+        if event.entity != shown:
+            return
+        if event.ids is None:
+            if self.search_input.text():
+                # Keep the cashier's search, just run it again
+                self.search_items()
+            else:
+                self.refresh_available_items()
+            return
+        
+        if event.action == DELETE:
+            self.available_model.remove_ids(event.ids)
+        elif self.search_input.text():
+            # Changed rows may now match the active search, or stop matching
+            if event.action == INSERT or event.touches('name'):
+                self.search_items()
+        elif event.touches('name', 'price'):
+            # Stock is not shown here, so checkouts need no work at all
+            if shown == "inventory":
+                items, item_type = self.inventory_service.get_items_by_ids(event.ids), "item"
+            else:
+                items, item_type = self.services_service.get_services_by_ids(event.ids), "service"
+            self.available_model.update_rows([(item.id, item.name, item_type, item.price) for item in items],
+                                             append_missing=event.action == INSERT)
+    
     def populate_available_table(self, items, item_type):
-        self.available_table.setRowCount(len(items))
-        for row, item in enumerate(items):
-            self.available_table.setItem(row, 0, QTableWidgetItem(str(item.id)))
-            self.available_table.setItem(row, 1, QTableWidgetItem(item.name))
-            self.available_table.setItem(row, 2, QTableWidgetItem(item_type.title()))
-            price = item.price
-            self.available_table.setItem(row, 3, QTableWidgetItem(format_currency(price)))
+        self.available_model.set_rows([(item.id, item.name, item_type, item.price) for item in items])
     
     def search_items(self):
         search_term = self.search_input.text()
         item_type = self.type_combo.currentText()
         if item_type == "Items":
-            items = self.inventory_service.search_items(search_term)
-            self.populate_available_table(items, "item")
+            self.search_controller.request(
+                lambda: (self.inventory_service.search_items(search_term), "item")
+            )
         else:
-            services = self.services_service.search_services(search_term)
-            self.populate_available_table(services, "service")
+            self.search_controller.request(
+                lambda: (self.services_service.search_services(search_term), "service")
+            )
+    
+    def show_search_results(self, results):
+        items, item_type = results
+        self.populate_available_table(items, item_type)
+    
+    def show_search_error(self, message):
+        # Old results no longer match the search text, do not leave them up
+        self.available_model.set_rows([])
+        QMessageBox.warning(self, "Search Failed", f"Could not search: {message}")
     
     def add_to_cart(self):
-        selected_row = self.available_table.currentRow()
+        selected_row = current_row(self.available_table)
         if selected_row == -1:
             QMessageBox.warning(self, "Warning", "Please select an item to add to cart.")
             return
         
-        item_id = int(self.available_table.item(selected_row, 0).text())
-        item_name = self.available_table.item(selected_row, 1).text()
-        item_type = self.available_table.item(selected_row, 2).text().lower()
-        price_text = self.available_table.item(selected_row, 3).text().replace('₱', '')
-        price = float(price_text)
+        item_id, item_name, item_type, price = self.available_model.row(selected_row)
         quantity = self.quantity_spin.value()
         
-        # Check stock for inventory items
+        # Reserve inventory items, counting what is already in the cart and
+        # what other terminals are holding
         if item_type == "item":
-            item = self.inventory_service.get_item_by_id(item_id)
-            if item.stock < quantity:
-                QMessageBox.warning(self, "Warning", f"Not enough stock! Only {item.stock} available.")
+            try:
+                self.reservations.reserve(item_id, quantity)
+            except InsufficientStockError as e:
+                available = e.shortages[0][2]
+                in_cart = self.cart.quantity_of(item_type, item_id)
+                QMessageBox.warning(self, "Warning",
+                                    f"Not enough stock! Only {available} available, {in_cart} already in cart.")
+                return
+            except (sqlite3.Error, PoolTimeout) as e:
+                QMessageBox.warning(self, "Warning", f"Could not reserve stock: {e}")
                 return
         
-        cart_item = CartItem(item_id, item_name, item_type, price, quantity)
-        self.cart.append(cart_item)
-        self.update_cart_display()
+        self.update_cart_line(self.cart.add(item_id, item_name, item_type, price, quantity))
         self.quantity_spin.setValue(1)
     
+    def scan_code(self):
+        code = self.scan_input.text().strip()
+        self.scan_input.clear()
+        if not code:
+            return
+        
+        # Served from the catalog cache's SKU index, no query in the common case
+        item = self.inventory_service.get_item_by_sku(code)
+        if item is None:
+            self.scan_status.setText(f"Unknown code: {code}")
+            QApplication.beep()
+            return
+        
+        try:
+            self.reservations.reserve(item.id, 1)
+        except InsufficientStockError as e:
+            available = e.shortages[0][2]
+            self.scan_status.setText(f"Not enough stock for {item.name}, only {available} available")
+            QApplication.beep()
+            return
+        except (sqlite3.Error, PoolTimeout) as e:
+            self.scan_status.setText(f"Could not reserve {item.name}: {e}")
+            QApplication.beep()
+            return
+        
+        # Repeat scans merge into the existing line
+        self.update_cart_line(self.cart.add(item.id, item.name, 'item', item.price, 1))
+        self.scan_status.setText(f"Added {item.name}")
+    
     def add_to_cart_from_table(self, index):
         self.add_to_cart()
     
+    def cart_row(self, line):
+        return ((line.type, line.id), line.name, line.type, line.price, line.quantity, line.total)
+    
+    def update_cart_line(self, line):
+        """Refresh or append the one cart row that changed"""
+        self.cart_model.update_rows([self.cart_row(line)], append_missing=True)
+        self.total_label.setText(f"Total: {format_currency(self.cart.total)}")
+    
     def update_cart_display(self):
-        self.cart_table.setRowCount(len(self.cart))
-        total = 0
-        for row, item in enumerate(self.cart):
-            self.cart_table.setItem(row, 0, QTableWidgetItem(str(item.id)))
-            self.cart_table.setItem(row, 1, QTableWidgetItem(item.name))
-            self.cart_table.setItem(row, 2, QTableWidgetItem(item.type.title()))
-            self.cart_table.setItem(row, 3, QTableWidgetItem(format_currency(item.price)))
-            self.cart_table.setItem(row, 4, QTableWidgetItem(str(item.quantity)))
-            self.cart_table.setItem(row, 5, QTableWidgetItem(format_currency(item.total)))
-            total += item.total
-        self.total_label.setText(f"Total: {format_currency(total)}")
+        self.cart_model.set_rows([self.cart_row(line) for line in self.cart])
+        self.total_label.setText(f"Total: {format_currency(self.cart.total)}")
     
     def clear_cart(self):
         if self.cart:
             reply = QMessageBox.question(self, "Clear Cart", "Clear the cart?")
             if reply == QMessageBox.StandardButton.Yes:
+                held = self.cart.item_quantities()
                 self.cart.clear()
                 self.update_cart_display()
                 self.customer_input.clear()  # Clear customer name too
+                try:
+                    self.reservations.release(held)
+                except (sqlite3.Error, PoolTimeout) as e:
+                    QMessageBox.warning(self, "Warning",
+                                        f"Could not release the cart's stock, it frees up when the hold expires: {e}")
     
     def checkout(self):
         if not self.cart:
             QMessageBox.warning(self, "Warning", "Cart is empty!")
             return
         
-        total = sum(item.total for item in self.cart)
+        total = self.cart.total
         customer_name = self.customer_input.text().strip()
         
         # Create confirmation message with customer name
@@ -219,13 +342,52 @@ class SalesTab(QWidget):
         reply = QMessageBox.question(self, "Confirm Checkout", confirm_message)
         
         if reply == QMessageBox.StandardButton.Yes:
-            if self.sales_service.record_sale(self.cart, total, customer_name):
-                self.show_receipt(customer_name)
-                self.cart.clear()
-                self.update_cart_display()
-                self.customer_input.clear()  # Clear customer name after checkout
-                self.data_updated.emit()
-                QMessageBox.information(self, "Success", "Sale completed successfully!")
+            # Stock was reserved as lines were added, so the journal write
+            # is the whole checkout and never waits on the shared database
+            try:
+                sale_uuid = self.journal.append(self.cart, total, customer_name)
+            except sqlite3.Error as e:
+                QMessageBox.critical(self, "Error", f"Could not save the sale: {e}")
+                return
+            # Keep the stock held for the sale, not for the next cart. Queued,
+            # not waited on; the replay moves the holds itself if this failed
+            self.sales_service.hold_for_sale(sale_uuid, list(self.cart))
+            self.sync_worker.wake()
+            self.update_sync_status()
+            
+            self.show_receipt(customer_name)
+            self.cart.clear()
+            self.update_cart_display()
+            self.customer_input.clear()  # Clear customer name after checkout
+            self.data_updated.emit()
+            QMessageBox.information(self, "Success", "Sale completed successfully!")
+    
+    def update_sync_status(self):
+        """Show sales still waiting in the journal and why syncing stopped"""
+        pending = self.journal.pending_count()
+        failed = self.journal.failed_count()
+        error = self.sync_worker.last_error
+        
+        parts = [f"{pending} sale(s) waiting to sync" if pending else "All sales synced"]
+        if failed:
+            parts.append(f"{failed} set aside")
+        text = ", ".join(parts)
+        if error:
+            text += f" - last error: {error}"
+        self.sync_status.setText(text)
+        self.sync_status.setStyleSheet("color: #dc3545;" if failed or error else "")
+    
+    def release_on_quit(self):
+        try:
+            self.reservations.release(self.cart.item_quantities())
+        except (sqlite3.Error, PoolTimeout) as e:
+            # No window left to warn in, the holds expire after the TTL
+            print(f"Could not release cart holds: {e}", file=sys.stderr)
+    
+    def stop_sync(self):
+        self.sync_timer.stop()
+        self.sync_worker.stop()
+        self.journal.close()
     
     def show_receipt(self, customer_name):
         receipt_dialog = ReceiptDialog(self.cart, customer_name, self)
@@ -1,9 +1,11 @@
 class Service:
+    __slots__ = ('id', 'name', 'category', 'price', 'description')
+    
     def __init__(self, id, name, category, price, description):
         self.id = id
         self.name = name
         self.category = category
-        self.price = price
+        self.price = price  # Integer centavos
         self.description = description
     
     @classmethod
@@ -1,12 +1,31 @@
 from core.db import DatabaseManager
+from core.utils import fts_prefix_query
+from core.events import ChangeEvent, INSERT, UPDATE, DELETE
+from core.cache import shared_cache
 from .models import Service
 
 class ServicesService:
     def __init__(self, db):
         self.db = db
+        self.cache = shared_cache(db, 'services', self._load_all_services, self._load_services_by_ids)
     
     def get_all_services(self):
         """Get all services"""
+        return self.cache.get_all()
+    
+    def get_service_by_id(self, service_id):
+        """Get service by ID"""
+        return self.cache.get(service_id)
+    
+    def get_services_by_ids(self, service_ids):
+        """Get the services with the given IDs"""
+        return self.cache.get_many(list(service_ids))
+    
+    def get_services_by_category(self, category):
+        """Get all services in one category"""
+        return self.cache.get_by_category(category)
+    
+    def _load_all_services(self):
         conn = self.db.get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM services ORDER BY name")
@@ -14,61 +33,68 @@ class ServicesService:
         # REMOVED: conn.close()
         return services
     
-    def get_service_by_id(self, service_id):
-        """Get service by ID"""
+    def _load_services_by_ids(self, service_ids):
+        if not service_ids:
+            return []
         conn = self.db.get_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM services WHERE id = ?", (service_id,))
-        row = cursor.fetchone()
-        # REMOVED: conn.close()
-        return Service.from_db_row(row) if row else None
+        placeholders = ",".join("?" * len(service_ids))
+        cursor.execute(f"SELECT * FROM services WHERE id IN ({placeholders})", service_ids)
+        return [Service.from_db_row(row) for row in cursor.fetchall()]
     
     def add_service(self, name, category, price, description):
         """Add new service"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO services (name, category, price, description) VALUES (?, ?, ?, ?)",
-            (name, category, price, description)
-        )
-        conn.commit()
-        # REMOVED: conn.close()
+        with self.db.transaction() as cursor:
+            cursor.execute(
+                "INSERT INTO services (name, category, price, description) VALUES (?, ?, ?, ?)",
+                (name, category, price, description)
+            )
+        self.db.events.publish(ChangeEvent('services', INSERT, [cursor.lastrowid]))
         return True
     
     def update_service(self, service_id, name, category, price, description):
         """Update service"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE services SET name=?, category=?, price=?, description=? WHERE id=?",
-            (name, category, price, description, service_id)
-        )
-        conn.commit()
-        # REMOVED: conn.close()
+        with self.db.transaction() as cursor:
+            cursor.execute(
+                "UPDATE services SET name=?, category=?, price=?, description=? WHERE id=?",
+                (name, category, price, description, service_id)
+            )
+        self.db.events.publish(ChangeEvent('services', UPDATE, [service_id],
+                                           ['name', 'category', 'price', 'description']))
         return True
     
     def delete_service(self, service_id):
         """Delete service"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM services WHERE id=?", (service_id,))
-        conn.commit()
-        # REMOVED: conn.close()
+        with self.db.transaction() as cursor:
+            cursor.execute("DELETE FROM services WHERE id=?", (service_id,))
+        self.db.events.publish(ChangeEvent('services', DELETE, [service_id]))
         return True
     
     def search_services(self, search_term, category_filter=None):
-        """Search services"""
+        """Search services by name, category and description, best matches first"""
+        match = fts_prefix_query(search_term)
+        if not match:
+            # Plain listing or category filter, served from the cache
+            if category_filter and category_filter != "All":
+                return self.get_services_by_category(category_filter)
+            return self.get_all_services()
+        
         conn = self.db.get_connection()
         cursor = conn.cursor()
         
-        query = "SELECT * FROM services WHERE name LIKE ?"
-        params = [f'%{search_term}%']
+        query = (
+            "SELECT services.* FROM services_fts "
+            "JOIN services ON services.id = services_fts.rowid "
+            "WHERE services_fts MATCH ?"
+        )
+        params = [match]
         
         if category_filter and category_filter != "All":
-            query += " AND category = ?"
+            query += " AND services.category = ?"
             params.append(category_filter)
         
-        query += " ORDER BY name"
+        # Name hits outrank category hits, which outrank description hits
+        query += " ORDER BY bm25(services_fts, 10.0, 4.0, 1.0), services.name"
         cursor.execute(query, params)
         services = [Service.from_db_row(row) for row in cursor.fetchall()]
         # REMOVED: conn.close()
@@ -1,10 +1,16 @@
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, 
-                            QTableWidgetItem, QPushButton, QLineEdit, QComboBox,
-                            QLabel, QMessageBox, QDialog, QFormLayout, QDialogButtonBox,
-                            QTextEdit, QHeaderView)
+import csv
+import sqlite3
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit,
+                            QComboBox, QLabel, QMessageBox, QDialog, QFormLayout,
+                            QDialogButtonBox, QFileDialog, QProgressDialog, QApplication, QTextEdit)
 from PyQt6.QtCore import Qt, pyqtSignal
 from .service import ServicesService
-from core.utils import format_currency, validate_price
+from core.utils import format_currency, format_amount, to_cents, validate_price
+from core.table_model import RowTableModel, create_table_view, current_row
+from core.search import SearchController
+from core.qt_events import ChangeRelay
+from core.events import INSERT, UPDATE, DELETE
+from importer.service import CatalogImporter
 
 class ServicesTab(QWidget):
     data_updated = pyqtSignal()
@@ -13,6 +19,11 @@ class ServicesTab(QWidget):
         super().__init__()
         self.db = db
         self.services_service = ServicesService(db)
+        self.search_controller = SearchController(db, parent=self)
+        self.search_controller.results_ready.connect(self.populate_table)
+        self.search_controller.search_failed.connect(self.show_search_error)
+        self.changes = ChangeRelay(db.events, self)
+        self.changes.changed.connect(self.apply_change)
         self.init_ui()
         self.refresh_data()
     
@@ -37,11 +48,9 @@ class ServicesTab(QWidget):
         layout.addLayout(search_layout)
         
         # Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["ID", "Name", "Category", "Price", "Description"])
-        header = self.table.horizontalHeader()
-        header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.model = RowTableModel(["ID", "Name", "Category", "Price", "Description"],
+                                   {3: format_currency})
+        self.table = create_table_view(self.model)
         layout.addWidget(self.table)
         
         # Buttons
@@ -52,10 +61,13 @@ class ServicesTab(QWidget):
         self.edit_btn.clicked.connect(self.edit_service)
         self.delete_btn = QPushButton("Delete Service")
         self.delete_btn.clicked.connect(self.delete_service)
+        self.import_btn = QPushButton("Import CSV...")
+        self.import_btn.clicked.connect(self.import_csv)
         
         button_layout.addWidget(self.add_btn)
         button_layout.addWidget(self.edit_btn)
         button_layout.addWidget(self.delete_btn)
+        button_layout.addWidget(self.import_btn)
         button_layout.addStretch()
         layout.addLayout(button_layout)
         self.setLayout(layout)
@@ -69,22 +81,60 @@ class ServicesTab(QWidget):
         for category in categories:
             self.category_filter.addItem(category)
     
+    def refresh_categories(self):
+        """Reload the category filter, keeping the current choice"""
+        current = self.category_filter.currentText()
+        self.category_filter.blockSignals(True)
+        self.category_filter.clear()
+        self.category_filter.addItem("All Categories")
+        self.category_filter.addItems(self.services_service.get_categories())
+        index = self.category_filter.findText(current)
+        self.category_filter.setCurrentIndex(max(index, 0))
+        self.category_filter.blockSignals(False)
+    
+    def apply_change(self, event):
+        """Apply a services ChangeEvent to just the affected rows"""
+        if event.entity != 'services':
+            return
+        if event.ids is None:
+            # Changed elsewhere, reload through the active search and filter
+            self.refresh_categories()
+            self.search_services()
+            return
+        
+        filtered = self.search_input.text() or self.category_filter.currentIndex() > 0
+        if event.action == DELETE:
+            self.model.remove_ids(event.ids)
+        elif filtered and (event.action == INSERT or event.touches('name', 'category', 'description')):
+            # Changed rows may now match the active search, or stop matching
+            self.search_services()
+        else:
+            services = self.services_service.get_services_by_ids(event.ids)
+            self.model.update_rows([self.service_row(service) for service in services],
+                                   append_missing=event.action == INSERT)
+        
+        if event.action != UPDATE or event.touches('category'):
+            self.refresh_categories()
+    
     def populate_table(self, services):
-        self.table.setRowCount(len(services))
-        for row, service in enumerate(services):
-            self.table.setItem(row, 0, QTableWidgetItem(str(service.id)))
-            self.table.setItem(row, 1, QTableWidgetItem(service.name))
-            self.table.setItem(row, 2, QTableWidgetItem(service.category))
-            self.table.setItem(row, 3, QTableWidgetItem(format_currency(service.price)))
-            self.table.setItem(row, 4, QTableWidgetItem(service.description))
+        self.model.set_rows([self.service_row(service) for service in services])
+    
+    def show_search_error(self, message):
+        # Old results no longer match the search text, do not leave them up
+        self.model.set_rows([])
+        QMessageBox.warning(self, "Search Failed", f"Could not search: {message}")
+    
+    def service_row(self, service):
+        return (service.id, service.name, service.category, service.price, service.description)
     
     def search_services(self):
         search_term = self.search_input.text()
         category_filter = self.category_filter.currentText()
         if category_filter == "All Categories":
             category_filter = None
-        services = self.services_service.search_services(search_term, category_filter)
-        self.populate_table(services)
+        self.search_controller.request(
+            lambda: self.services_service.search_services(search_term, category_filter)
+        )
     
     def add_service(self):
         dialog = ServiceDialog(self)
@@ -92,37 +142,69 @@ class ServicesTab(QWidget):
             name, category, price, description = dialog.get_data()
             if self.services_service.add_service(name, category, price, description):
                 QMessageBox.information(self, "Success", "Service added successfully!")
-                self.refresh_data()
                 self.data_updated.emit()
     
     def edit_service(self):
-        selected_row = self.table.currentRow()
+        selected_row = current_row(self.table)
         if selected_row == -1:
             QMessageBox.warning(self, "Warning", "Please select a service to edit.")
             return
-        service_id = int(self.table.item(selected_row, 0).text())
+        service_id = self.model.row_id(selected_row)
         service = self.services_service.get_service_by_id(service_id)
         dialog = ServiceDialog(self, service)
         if dialog.exec():
             name, category, price, description = dialog.get_data()
             if self.services_service.update_service(service_id, name, category, price, description):
                 QMessageBox.information(self, "Success", "Service updated successfully!")
-                self.refresh_data()
                 self.data_updated.emit()
     
     def delete_service(self):
-        selected_row = self.table.currentRow()
+        selected_row = current_row(self.table)
         if selected_row == -1:
             QMessageBox.warning(self, "Warning", "Please select a service to delete.")
             return
-        service_id = int(self.table.item(selected_row, 0).text())
-        service_name = self.table.item(selected_row, 1).text()
+        service_id, service_name = self.model.row(selected_row)[:2]
         reply = QMessageBox.question(self, "Confirm Delete", f"Delete '{service_name}'?")
         if reply == QMessageBox.StandardButton.Yes:
             if self.services_service.delete_service(service_id):
                 QMessageBox.information(self, "Success", "Service deleted successfully!")
-                self.refresh_data()
                 self.data_updated.emit()
+    
+    def import_csv(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import Price List", "", "CSV Files (*.csv)")
+        if not path:
+            return
+        
+        progress = QProgressDialog("Importing...", None, 0, 0, self)
+        progress.setWindowTitle("Import")
+        progress.show()
+        
+        def report(done):
+            progress.setLabelText(f"Imported {done:,} rows...")
+            QApplication.processEvents()
+        
+        try:
+            result = CatalogImporter(self.db, progress=report).import_services(path)
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            QMessageBox.critical(self, "Import Failed", str(e))
+            return
+        except sqlite3.Error as e:
+            # Chunks are committed one at a time, the ones before the error stay
+            QMessageBox.critical(self, "Import Failed",
+                                 f"Database error: {e}\n\nRows imported before the error were kept.")
+            self.data_updated.emit()
+            return
+        finally:
+            progress.close()
+        
+        message = (f"{result.inserted:,} added, {result.updated:,} updated, "
+                   f"{len(result.rejected):,} rejected.")
+        if result.rejected:
+            message += "\n\n" + "\n".join(
+                f"Line {rejected.line_number}: {rejected.reason}" for rejected in result.rejected[:10]
+            )
+        QMessageBox.information(self, "Import Complete", message)
+        self.data_updated.emit()
 
 class ServiceDialog(QDialog):
     def __init__(self, parent=None, service=None):
@@ -144,7 +226,7 @@ class ServiceDialog(QDialog):
         if self.service:
             self.name_input.setText(self.service.name)
             self.category_input.setText(self.service.category)
-            self.price_input.setText(str(self.service.price))
+            self.price_input.setText(format_amount(self.service.price))
             self.description_input.setText(self.service.description)
         
         layout.addRow("Name:", self.name_input)
@@ -162,7 +244,7 @@ class ServiceDialog(QDialog):
         return (
             self.name_input.text().strip(),
             self.category_input.text().strip(),
-            float(self.price_input.text()),
+            to_cents(self.price_input.text()),
             self.description_input.toPlainText().strip()
         )
     